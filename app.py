@@ -1,10 +1,12 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 import os
 from datetime import datetime
-import PyPDF2
-import uuid
-from services import CompanyMatcherService, OutreachService
+from services import (
+    registry, QueueFullError, ExtractionError, create_session_store, create_upload_retention
+)
+from services.request_logging import configure_logging, RequestLogger, Preview
+from services.metrics import metrics, instrument_app, cache_stats_callback, STAGE_LATENCY
 from dotenv import load_dotenv
 import traceback
 from flask_cors import CORS
@@ -13,8 +15,8 @@ import json
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (LOG_LEVEL, LOG_FORMAT, LOG_BODY_SAMPLE_RATE, ...)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -31,20 +33,12 @@ cors = CORS(app, resources={
     }
 })
 
-@app.before_request
-def log_request_info():
-    logger.debug('Headers: %s', dict(request.headers))
-    logger.debug('Body: %s', request.get_data())
-    logger.debug('Args: %s', dict(request.args))
-    if request.is_json:
-        logger.debug('JSON: %s', request.get_json())
+# One access log line per request; bodies only for a sampled fraction
+request_logger = RequestLogger(app)
+instrument_app(app)
 
 @app.after_request
 def after_request(response):
-    logger.debug('Response Status: %s', response.status)
-    logger.debug('Response Headers: %s', dict(response.headers))
-    logger.debug('Response Body: %s', response.get_data())
-    
     origin = request.headers.get('Origin')
     if origin in ["http://localhost:3000", "https://resume-matcher-lilac.vercel.app"]:
         response.headers.add('Access-Control-Allow-Origin', origin)
@@ -55,7 +49,7 @@ def after_request(response):
 @app.errorhandler(400)
 def handle_bad_request(e):
     logger.error('Bad Request: %s', str(e))
-    logger.error('Request data: %s', request.get_data())
+    logger.error('Request data: %s', Preview(request.get_data()))
     return jsonify({
         'error': 'Bad Request',
         'message': str(e),
@@ -66,6 +60,10 @@ def handle_bad_request(e):
         }
     }), 400
 
+@app.errorhandler(413)
+def handle_too_large(e):
+    return jsonify({'error': f'File is larger than {app.config["MAX_CONTENT_LENGTH"] // (1024 * 1024)} MB'}), 413
+
 @app.errorhandler(Exception)
 def handle_exception(e):
     logger.error('Unhandled Exception: %s', str(e))
@@ -82,29 +80,59 @@ ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
-# Create uploads directory if it doesn't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Resumes are parsed in memory; raw files are only kept when
+# RESUME_STORE_UPLOADS=1, and then pruned by age and count
+resume_extractor = registry.resume_extractor()
+upload_retention = create_upload_retention(UPLOAD_FOLDER)
+# Repeat uploads of the same file reuse the text extracted the first time
+resume_index = registry.resume_index()
+# Reject oversized uploads before the body is read (plus room for form fields)
+app.config['MAX_CONTENT_LENGTH'] = resume_extractor.max_bytes + 64 * 1024
+
+# Session storage; SESSION_BACKEND=sqlite shares sessions between workers
+session_store = create_session_store()
 
-# In-memory session storage (replace with proper database in production)
-sessions = {}
+# Initialize services once per worker; clients and connections are shared
+# by every request thread
+matcher_service = registry.matcher()
+outreach_service = registry.outreach()
+job_queue = registry.job_queue()
 
-# Initialize services
-matcher_service = CompanyMatcherService()
-outreach_service = OutreachService()
+# Cache and job queue state, read whenever /metrics is scraped
+metrics.register_callback(
+    'startup_explorer_cache_lookups_total',
+    'Cache lookups by cache and outcome (memory_hits, disk_hits, misses)',
+    cache_stats_callback({
+        'embedding': registry.embedding_cache().stats,
+        'evaluation': registry.evaluation_cache().stats,
+        'resume': resume_index.stats,
+        'outreach': registry.outreach_cache().stats,
+    }),
+    type_name='counter'
+)
+metrics.register_callback(
+    'startup_explorer_job_queue',
+    'Async match job queue state',
+    lambda: [({'field': key}, value) for key, value in job_queue.stats().items()]
+)
+try:
+    registry.warm()
+except Exception as e:
+    logger.warning('Could not warm Chroma collection: %s', str(e))
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def create_session():
-    session_id = str(uuid.uuid4())
-    sessions[session_id] = {
+def create_session(**fields):
+    return session_store.create({
         'resume_text': None,
+        'resume_hash': None,
         'preferences': None,
         'uploaded_file': None,
         'matches': None,
-        'outreach_packages': None
-    }
-    return session_id
+        'outreach_packages': None,
+        **fields
+    })
 
 @app.route('/uploadResume', methods=['POST'])
 def upload_resume():
@@ -124,24 +152,30 @@ def upload_resume():
             filename = secure_filename(file.filename)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             unique_filename = f"{timestamp}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            file.save(filepath)
+            data = file.read()
+            content_hash = resume_index.hash_content(data)
             
-            # Extract text from PDF if it's a PDF file
-            resume_text = ""
-            if filename.lower().endswith('.pdf'):
+            indexed = resume_index.get(content_hash)
+            if indexed is not None:
+                logger.info('Reusing extracted text for resume %s', content_hash[:12])
+                resume_text = indexed['resume_text']
+                resume_hash = indexed.get('text_hash')
+            else:
                 try:
-                    with open(filepath, 'rb') as pdf_file:
-                        pdf_reader = PyPDF2.PdfReader(pdf_file)
-                        for page in pdf_reader.pages:
-                            resume_text += page.extract_text()
-                except Exception as e:
-                    return jsonify({'error': f'Error processing PDF: {str(e)}'}), 500
+                    with STAGE_LATENCY.time(stage='resume_extraction'):
+                        resume_text = resume_extractor.extract(data, filename)
+                except ExtractionError as e:
+                    return jsonify({'error': str(e)}), 400
+                resume_hash = resume_index.add(content_hash, resume_text, filename, len(data))['text_hash']
+            
+            stored_path = upload_retention.save(data, unique_filename)
             
             # Create a new session and store resume data
-            session_id = create_session()
-            sessions[session_id]['resume_text'] = resume_text
-            sessions[session_id]['uploaded_file'] = unique_filename
+            session_id = create_session(
+                resume_text=resume_text,
+                resume_hash=resume_hash,
+                uploaded_file=unique_filename if stored_path else None
+            )
             
             return jsonify({
                 'message': 'Resume uploaded successfully',
@@ -162,11 +196,11 @@ def submit_preferences():
     try:
         logger.info('Processing preferences submission')
         data = request.json
-        logger.debug('Received preferences data: %s', json.dumps(data, indent=2))
+        logger.debug('Received preferences data: %s', data)
         
         session_id = data.get('session_id')
         
-        if not session_id or session_id not in sessions:
+        if not session_id or session_id not in session_store:
             return jsonify({'error': 'Invalid or missing session ID'}), 400
         
         required_fields = ['desired_roles', 'industries', 'work_locations', 'company_stages']
@@ -184,7 +218,8 @@ def submit_preferences():
         }
         
         # Store preferences in session
-        sessions[session_id]['preferences'] = preferences
+        if session_store.set_fields(session_id, preferences=preferences) is None:
+            return jsonify({'error': 'Invalid or missing session ID'}), 400
         
         return jsonify({
             'message': 'Preferences submitted successfully',
@@ -200,12 +235,17 @@ def submit_preferences():
 @app.route('/getSessionData', methods=['GET'])
 def get_session_data():
     session_id = request.args.get('session_id')
+    session_data = session_store.get(session_id) if session_id else None
     
-    if not session_id or session_id not in sessions:
+    if not session_data:
         return jsonify({'error': 'Invalid or missing session ID'}), 400
+
+    # Sessions only keep references to the matched documents
+    if session_data.get('matches'):
+        session_data['matches'] = matcher_service.hydrate_matches(session_data['matches'])
         
     return jsonify({
-        'session_data': sessions[session_id]
+        'session_data': session_data
     }), 200
 
 @app.route('/api/matches', methods=['GET'])
@@ -215,24 +255,40 @@ def get_matches():
         session_id = request.args.get('session_id')
         logger.debug('Session ID: %s', session_id)
         
-        if not session_id or session_id not in sessions:
+        session_data = session_store.get(session_id) if session_id else None
+        if not session_data:
             return jsonify({'error': 'Invalid or missing session ID'}), 400
         
-        session_data = sessions[session_id]
-        
         if not session_data['resume_text']:
             return jsonify({'error': 'No resume found. Please upload a resume first.'}), 400
         
         if not session_data['preferences']:
             return jsonify({'error': 'No preferences found. Please set preferences first.'}), 400
 
+        if request.args.get('mode') == 'async':
+            try:
+                job_id = job_queue.submit(
+                    lambda report_progress: run_match_job(session_id, report_progress),
+                    kind='matches'
+                )
+            except QueueFullError as e:
+                logger.warning('Rejected match job: %s', str(e))
+                response = jsonify({'error': 'Server is busy, please retry shortly'})
+                response.headers['Retry-After'] = '10'
+                return response, 503
+            return jsonify({
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f"/api/jobs/{job_id}"
+            }), 202
+
         try:
-            matcher = CompanyMatcherService()
-            matches = matcher.get_company_matches(
+            matches = matcher_service.get_company_matches(
                 resume_text=session_data['resume_text'],
-                preferences=session_data['preferences']
+                preferences=session_data['preferences'],
+                resume_hash=session_data.get('resume_hash')
             )
-            sessions[session_id]['matches'] = matches
+            session_store.set_fields(session_id, matches=matcher_service.compact_matches(matches))
             return jsonify({
                 'matches': matches,
                 'count': len(matches)
@@ -247,6 +303,131 @@ def get_matches():
         logger.error('Traceback: %s', traceback.format_exc())
         raise
 
+def run_match_job(session_id: str, report_progress) -> dict:
+    """Run the matching pipeline for a session inside a background job"""
+    session_data = session_store.get(session_id)
+    if not session_data:
+        raise ValueError('Session expired before the match job started')
+    report_progress({'stage': 'retrieving'})
+    evaluated = 0
+    for event in matcher_service.iter_company_matches(
+        resume_text=session_data['resume_text'],
+        preferences=session_data['preferences'],
+        resume_hash=session_data.get('resume_hash')
+    ):
+        if event['event'] == 'retrieval':
+            report_progress({'stage': 'evaluating', 'candidates': event['data']['count'], 'matches_found': 0})
+        elif event['event'] == 'match':
+            evaluated += 1
+            report_progress({'matches_found': evaluated})
+        elif event['event'] == 'summary':
+            matches = matcher_service.compact_matches(event['data'])
+            session_store.set_fields(session_id, matches=matches)
+            report_progress({'stage': 'done'})
+            # Keep finished jobs small too; results are hydrated when polled
+            return matches
+
+@app.route('/api/jobs/stats', methods=['GET'])
+def get_job_stats():
+    return jsonify(job_queue.stats())
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job ID'}), 404
+    if job['kind'] == 'matches' and job['result']:
+        job['result'] = matcher_service.hydrate_matches(job['result'])
+    return jsonify(job)
+
+def format_stream_event(event: str, data, stream_format: str = 'sse') -> str:
+    """Encode one event as a Server-Sent Event or as a line of NDJSON"""
+    if stream_format == 'ndjson':
+        return json.dumps({'event': event, 'data': data}) + '\n'
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_response(events, stream_format: str = 'sse') -> Response:
+    mimetype = 'application/x-ndjson' if stream_format == 'ndjson' else 'text/event-stream'
+    return Response(
+        stream_with_context(events),
+        mimetype=mimetype,
+        headers={
+            'Cache-Control': 'no-cache',
+            # Stop reverse proxies from buffering the stream
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/api/matches/stream', methods=['GET'])
+def stream_matches():
+    """
+    Streaming variant of /api/matches.
+
+    Sends the retrieved candidates right away, then each match as soon as its
+    evaluation finishes, and ends with the same ranked summary /api/matches
+    returns. Use ?format=ndjson for newline-delimited JSON instead of SSE.
+    """
+    logger.info('Processing streaming matches request')
+    session_id = request.args.get('session_id')
+    stream_format = request.args.get('format', 'sse')
+
+    session_data = session_store.get(session_id) if session_id else None
+    if not session_data:
+        return jsonify({'error': 'Invalid or missing session ID'}), 400
+
+    if not session_data['resume_text']:
+        return jsonify({'error': 'No resume found. Please upload a resume first.'}), 400
+
+    if not session_data['preferences']:
+        return jsonify({'error': 'No preferences found. Please set preferences first.'}), 400
+
+    def generate():
+        try:
+            for event in matcher_service.iter_company_matches(
+                resume_text=session_data['resume_text'],
+                preferences=session_data['preferences'],
+                resume_hash=session_data.get('resume_hash')
+            ):
+                if event['event'] == 'summary':
+                    session_store.set_fields(session_id, matches=matcher_service.compact_matches(event['data']))
+                yield format_stream_event(event['event'], event['data'], stream_format)
+        except Exception as e:
+            logger.error('Error streaming matches: %s', str(e))
+            logger.error('Traceback: %s', traceback.format_exc())
+            yield format_stream_event('error', {'error': 'Failed to get company matches'}, stream_format)
+
+    return stream_response(generate(), stream_format)
+
+def find_company_info(session_data, company_name=None, document_id=None):
+    """
+    Company details by document id or by name, or None if not found.
+
+    A document id is resolved directly from the company profile indexed with
+    it; names are looked up in the session's matches.
+    """
+    if document_id:
+        company_info = matcher_service.get_company_info(document_id)
+        if company_info:
+            return company_info
+    matches = session_data.get('matches') or {}
+    for match in matches.get('matches', []):
+        if (document_id and match.get('document_id') == document_id) or (
+            not document_id and match.get('company_name') == company_name
+        ):
+            return {
+                'company_name': match.get('company_name'),
+                'company_description': match.get('company_description'),
+                'industry': match.get('industry'),
+            }
+    return None
+
+def store_outreach_package(session_id, company_name, outreach_package):
+    def store_package(data):
+        packages = data.get('outreach_packages') or {}
+        packages[company_name] = outreach_package
+        data['outreach_packages'] = packages
+    session_store.update(session_id, store_package)
+
 @app.route('/api/outreach', methods=['POST'])
 def generate_outreach_package():
     """
@@ -255,45 +436,32 @@ def generate_outreach_package():
     try:
         logger.info('Processing outreach package generation')
         data = request.json
-        logger.debug('Received data: %s', json.dumps(data, indent=2))
+        logger.debug('Received data: %s', data)
         
         session_id = data.get('session_id')
         company_name = data.get('company_name')
-        print(f"DEBUG: Session ID: {session_id}")
-        print(f"DEBUG: Company Name: {company_name}")
-        if not session_id or not company_name:
+        document_id = data.get('document_id')
+        logger.debug('Session ID: %s, company name: %s, document ID: %s', session_id, company_name, document_id)
+        if not session_id or not (company_name or document_id):
             return jsonify({
-                'error': 'Missing required parameters: session_id and company_name'
+                'error': 'Missing required parameters: session_id and company_name or document_id'
             }), 400
             
         # Get session data
-        session_data = sessions[session_id]
+        session_data = session_store.get(session_id)
        
         if not session_data:
             return jsonify({'error': 'Invalid session ID'}), 400
             
         resume_text = session_data.get('resume_text')
-        preferences = session_data.get('preferences', {})
-        # Initialize outreach_packages if it doesn't exist
-        if 'outreach_packages' not in session_data or session_data['outreach_packages'] is None:
-            session_data['outreach_packages'] = {}
+        preferences = session_data.get('preferences') or {}
          
-        # Get company info from previous matches
-        matches = session_data.get('matches', {})
-        matches = matches.get('matches', [])
-        
-        company_info = None
-        for match in matches:
-            if match.get('company_name') == company_name:
-                company_info = {
-                    'company_name': match.get('company_name'),
-                    'company_description': match.get('company_description'),
-                    'industry': match.get('metadata', {}).get('industry'),
-                }
-                break
+        # Get company info from its indexed profile or previous matches
+        company_info = find_company_info(session_data, company_name, document_id)
                 
         if not company_info:
             return jsonify({'error': 'Company not found in matches'}), 404
+        company_name = company_info['company_name']
             
         # Generate outreach package
         outreach_package = outreach_service.get_outreach_package(
@@ -301,10 +469,9 @@ def generate_outreach_package():
             company_info=company_info,
             role_preference=preferences.get('desired_roles', [''])[0]
         )
-        print(f"DEBUG: Outreach Package: {outreach_package}")
+        logger.debug('Outreach Package: %s', Preview(outreach_package))
         # Store the outreach package in session data (optional)
-        session_data['outreach_packages'] = session_data.get('outreach_packages', {})
-        session_data['outreach_packages'][company_name] = outreach_package
+        store_outreach_package(session_id, company_name, outreach_package)
         
         return jsonify({
             'success': True,
@@ -320,6 +487,171 @@ def generate_outreach_package():
         logger.error('Traceback: %s', traceback.format_exc())
         raise
 
+@app.route('/api/outreach/bulk', methods=['POST'])
+def generate_outreach_packages():
+    """
+    Generate outreach packages for several matched companies in one request.
+
+    Takes ``company_names`` as a list or ``"all"`` for every match in the
+    session. Packages are generated in parallel and returned keyed by
+    company, with failures reported per company under ``errors``. With
+    ?stream=1 each package is sent as soon as it is ready instead (SSE, or
+    NDJSON with &format=ndjson).
+    """
+    logger.info('Processing bulk outreach package generation')
+    data = request.json or {}
+    session_id = data.get('session_id')
+    company_names = data.get('company_names')
+    if not session_id or not company_names:
+        return jsonify({
+            'error': 'Missing required parameters: session_id and company_names'
+        }), 400
+    if company_names != 'all' and not isinstance(company_names, list):
+        return jsonify({'error': 'company_names must be an array or "all"'}), 400
+    if company_names != 'all' and not all(isinstance(name, str) and name.strip() for name in company_names):
+        return jsonify({'error': 'company_names must only contain non-empty strings'}), 400
+
+    session_data = session_store.get(session_id)
+    if not session_data:
+        return jsonify({'error': 'Invalid session ID'}), 400
+
+    if company_names == 'all':
+        matches = session_data.get('matches') or {}
+        company_names = [match['company_name'] for match in matches.get('matches', []) if match.get('company_name')]
+
+    companies = []
+    errors = {}
+    for company_name in dict.fromkeys(company_names):
+        company_info = find_company_info(session_data, company_name)
+        if company_info:
+            companies.append(company_info)
+        else:
+            errors[company_name] = 'Company not found in matches'
+    if not companies and not errors:
+        return jsonify({'error': 'No matches found. Please get matches first.'}), 400
+
+    preferences = session_data.get('preferences') or {}
+    packages = outreach_service.iter_outreach_packages(
+        resume_text=session_data.get('resume_text'),
+        companies=companies,
+        role_preference=preferences.get('desired_roles', [''])[0]
+    )
+
+    def response_package(company_name, outreach_package):
+        return {
+            'company_name': company_name,
+            'contacts': outreach_package['contacts'],
+            'cover_letter': outreach_package['cover_letter']
+        }
+
+    if request.args.get('stream') == '1':
+        stream_format = request.args.get('format', 'sse')
+
+        def generate():
+            for company_name, error in errors.items():
+                yield format_stream_event('package_error', {'company_name': company_name, 'error': error}, stream_format)
+            completed = 0
+            try:
+                for company_name, outreach_package in packages:
+                    if 'error' in outreach_package:
+                        errors[company_name] = outreach_package['error']
+                        yield format_stream_event('package_error', {
+                            'company_name': company_name, 'error': outreach_package['error']
+                        }, stream_format)
+                        continue
+                    store_outreach_package(session_id, company_name, outreach_package)
+                    completed += 1
+                    yield format_stream_event('package', response_package(company_name, outreach_package), stream_format)
+            except Exception as e:
+                logger.error('Error streaming outreach packages: %s', str(e))
+                logger.error('Traceback: %s', traceback.format_exc())
+                yield format_stream_event('error', {'error': 'Failed to generate outreach packages'}, stream_format)
+                return
+            yield format_stream_event('summary', {'completed': completed, 'errors': errors}, stream_format)
+
+        return stream_response(generate(), stream_format)
+
+    results = {}
+    for company_name, outreach_package in packages:
+        if 'error' in outreach_package:
+            errors[company_name] = outreach_package['error']
+        else:
+            results[company_name] = outreach_package
+
+    def store_packages(data):
+        stored = data.get('outreach_packages') or {}
+        stored.update(results)
+        data['outreach_packages'] = stored
+    if results:
+        session_store.update(session_id, store_packages)
+
+    return jsonify({
+        'success': bool(results),
+        'outreach_packages': {
+            company_name: response_package(company_name, outreach_package)
+            for company_name, outreach_package in results.items()
+        },
+        'errors': errors
+    })
+
+@app.route('/api/outreach/stream', methods=['GET'])
+def stream_outreach_package():
+    """
+    Streaming variant of /api/outreach.
+
+    Sends the contacts as soon as they are ready and the cover letter piece
+    by piece as it is generated, then the complete package. Use
+    ?format=ndjson for newline-delimited JSON instead of SSE.
+    """
+    logger.info('Processing streaming outreach request')
+    session_id = request.args.get('session_id')
+    company_name = request.args.get('company_name')
+    document_id = request.args.get('document_id')
+    stream_format = request.args.get('format', 'sse')
+    if not session_id or not (company_name or document_id):
+        return jsonify({
+            'error': 'Missing required parameters: session_id and company_name or document_id'
+        }), 400
+
+    session_data = session_store.get(session_id)
+    if not session_data:
+        return jsonify({'error': 'Invalid session ID'}), 400
+
+    company_info = find_company_info(session_data, company_name, document_id)
+    if not company_info:
+        return jsonify({'error': 'Company not found in matches'}), 404
+    company_name = company_info['company_name']
+
+    preferences = session_data.get('preferences') or {}
+
+    def generate():
+        try:
+            for event in outreach_service.iter_outreach_package(
+                resume_text=session_data.get('resume_text'),
+                company_info=company_info,
+                role_preference=preferences.get('desired_roles', [''])[0]
+            ):
+                if event['event'] == 'summary':
+                    store_outreach_package(session_id, company_name, event['data'])
+                    data = {
+                        'company_name': company_info['company_name'],
+                        'contacts': event['data']['contacts'],
+                        'cover_letter': event['data']['cover_letter']
+                    }
+                    yield format_stream_event('summary', data, stream_format)
+                else:
+                    yield format_stream_event(event['event'], event['data'], stream_format)
+        except Exception as e:
+            logger.error('Error streaming outreach package: %s', str(e))
+            logger.error('Traceback: %s', traceback.format_exc())
+            yield format_stream_event('error', {'error': 'Failed to generate outreach package'}, stream_format)
+
+    return stream_response(generate(), stream_format)
+
+@app.route('/metrics')
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def health_check():
     return jsonify({
@@ -1,6 +1,9 @@
 import os
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+import sys
+import argparse
+import sqlite3
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 import chromadb
 from chromadb.config import Settings
 import spacy
@@ -16,8 +19,21 @@ from dotenv import load_dotenv
 import hashlib
 from tenacity import retry, wait_exponential, stop_after_attempt
 from datetime import datetime
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import queue
+import threading
+import time
 import re 
 
+# Make the service package importable when run as `python data/data-indexer.py`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from services.embedding_cache import EmbeddingCache
+from services.company_profile import PROFILE_FIELDS, profile_from_metadata, profile_to_metadata
+
 # Load environment variables
 load_dotenv()
 openai.api_key = os.getenv('OPENAI_API_KEY')
@@ -33,12 +49,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# spaCy parsing settings for batch preprocessing
+SPACY_N_PROCESS = int(os.getenv("INDEXER_SPACY_PROCESSES", "1"))
+SPACY_BATCH_SIZE = int(os.getenv("INDEXER_SPACY_BATCH_SIZE", "16"))
+
+# Embedding request packing, concurrency and the account's rate limits
+EMBEDDING_BATCH_SIZE = int(os.getenv("INDEXER_EMBEDDING_BATCH_SIZE", "512"))
+EMBEDDING_BATCH_TOKENS = int(os.getenv("INDEXER_EMBEDDING_BATCH_TOKENS", "100000"))
+EMBEDDING_CONCURRENCY = int(os.getenv("INDEXER_EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_RPM = int(os.getenv("OPENAI_EMBEDDING_RPM", "3000"))
+EMBEDDING_TPM = int(os.getenv("OPENAI_EMBEDDING_TPM", "1000000"))
+
+# Concurrent GPT-4 profile extractions per batch
+PROFILE_CONCURRENCY = int(os.getenv("INDEXER_PROFILE_CONCURRENCY", "4"))
+
+# Documents buffered before each bulk Chroma write
+CHROMA_WRITE_BATCH_SIZE = int(os.getenv("INDEXER_CHROMA_BATCH_SIZE", "256"))
+
+DEFAULT_MANIFEST_PATH = "./data/cache/index_manifest.sqlite3"
+
+# Passage-level index: each document is also split into passages of about
+# this many words, embedded on their own and linked to their parent document
+PASSAGE_COLLECTION_NAME = "startup_press_release_passages"
+PASSAGE_MAX_WORDS = int(os.getenv("INDEXER_PASSAGE_WORDS", "120"))
+INDEX_PASSAGES = os.getenv("INDEXER_PASSAGES", "0") == "1"
+
+# Pipelined mode: processes for PDF extraction and spaCy, threads for the
+# OpenAI calls, and the capacity of the queues between the stages
+PIPELINE_CPU_WORKERS = int(os.getenv("INDEXER_CPU_WORKERS", str(os.cpu_count() or 2)))
+PIPELINE_IO_WORKERS = int(os.getenv("INDEXER_IO_WORKERS", "4"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("INDEXER_QUEUE_SIZE", "64"))
+
 @dataclass
 class ProcessedDocument:
     clean_text: str
     key_sections: Dict[str, str]
     extracted_entities: Dict[str, List[str]]
     metadata: Dict[str, any]
+    passages: List[str] = field(default_factory=list)
 
 class PDFExtractor:
     """Handles PDF document extraction"""
@@ -58,15 +106,24 @@ class PDFExtractor:
 
 class PressReleasePreprocessor:
     """Handles press release text preprocessing and metadata extraction"""
+
+    # Only sentence boundaries (parser) and entities (ner) are used
+    UNUSED_COMPONENTS = ["tagger", "attribute_ruler", "lemmatizer"]
     
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
+    def __init__(self, n_process: int = 1, batch_size: int = 16, passage_words: int = PASSAGE_MAX_WORDS):
+        self.nlp = spacy.load("en_core_web_sm", disable=self.UNUSED_COMPONENTS)
+        self.n_process = n_process
+        self.batch_size = batch_size
+        self.passage_words = passage_words
+        # Compiled once, these run on every document
         self.patterns = {
-            'image_captions': r'\(([^)]*(?:Image|Photo|Screenshot)[^)]*)\)',
-            'urls': r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
-            'email': r'\S+@\S+',
-            'multiple_spaces': r'\s+',
-            'special_chars': r'[^\w\s.,!?-]'
+            'image_captions': re.compile(r'\(([^)]*(?:Image|Photo|Screenshot)[^)]*)\)'),
+            'urls': re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'),
+            'email': re.compile(r'\S+@\S+'),
+            'multiple_spaces': re.compile(r'\s+'),
+            'special_chars': re.compile(r'[^\w\s.,!?-]'),
+            'more_information': re.compile(r'(?i)For more information.*$'),
+            'about_footer': re.compile(r'(?i)About .*\n.*$')
         }
         self.section_keywords = {
             'company_description': [
@@ -90,6 +147,81 @@ class PressReleasePreprocessor:
                 'seed', 'series', 'led by', 'participated'
             ]
         }
+        self.keyword_sections, self.keyword_pattern, self.acronym_pattern = \
+            self._compile_section_keywords(self.section_keywords)
+
+    @staticmethod
+    def _keyword_trie(keywords: List[str]) -> str:
+        """Regex alternation of ``keywords`` factored into a trie, so shared prefixes are tried once"""
+        trie: Dict = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            # A keyword ends here: the longer ones are optional (and tried first)
+            return f"(?:{body})?" if '' in node else body
+
+        return build(trie)
+
+    @classmethod
+    def _compile_section_keywords(cls, section_keywords: Dict[str, List[str]]):
+        """
+        Compile the section keywords into one multi-keyword matcher.
+
+        Keywords match case-insensitively, except all-caps acronyms such as
+        'AI', which must match exactly as whole words. The keyword regex sits
+        in a lookahead so overlapping keywords are all found; since only the
+        longest keyword at each position is reported, each keyword also
+        carries the sections of every keyword it starts with.
+        """
+        keyword_sections: Dict[str, set] = {}
+        for section_type, keywords in section_keywords.items():
+            for keyword in keywords:
+                key = keyword if keyword.isupper() else keyword.lower()
+                keyword_sections.setdefault(key, set()).add(section_type)
+        words = [keyword for keyword in keyword_sections if not keyword.isupper()]
+        acronyms = [keyword for keyword in keyword_sections if keyword.isupper()]
+        for keyword in words:
+            for other in words:
+                if other != keyword and keyword.startswith(other):
+                    keyword_sections[keyword] |= keyword_sections[other]
+
+        keyword_pattern = re.compile(f"(?=({cls._keyword_trie(words)}))") if words else None
+        acronym_pattern = re.compile(rf"\b(?:{cls._keyword_trie(acronyms)})\b") if acronyms else None
+        return keyword_sections, keyword_pattern, acronym_pattern
+
+    def _label_sentences(self, text: str, sentences) -> List[set]:
+        """
+        Section types of each sentence, from one scan of the whole document.
+
+        ``sentences`` are spans of a ``Doc`` parsed from ``text``; matches are
+        assigned to sentences by character offset.
+        """
+        starts = [sent.start_char for sent in sentences]
+        labels = [set() for _ in sentences]
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Keep offsets aligned for the few characters whose lowercase is longer
+            lowered = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+        matches = []
+        if self.keyword_pattern is not None:
+            matches.extend((match.start(), match.group(1)) for match in self.keyword_pattern.finditer(lowered))
+        if self.acronym_pattern is not None:
+            matches.extend((match.start(), match.group()) for match in self.acronym_pattern.finditer(text))
+        for position, keyword in matches:
+            idx = bisect_right(starts, position) - 1
+            # Keywords spanning a sentence boundary don't count, as before
+            if idx >= 0 and position + len(keyword) <= sentences[idx].end_char:
+                labels[idx] |= self.keyword_sections[keyword]
+        return labels
 
     def clean_html(self, text: str) -> str:
         """Remove HTML tags and clean up HTML entities"""
@@ -102,27 +234,27 @@ class PressReleasePreprocessor:
         text = unicodedata.normalize('NFKD', text)
         
         # Replace multiple spaces with single space
-        text = re.sub(self.patterns['multiple_spaces'], ' ', text)
+        text = self.patterns['multiple_spaces'].sub(' ', text)
         
         # Remove special characters but keep basic punctuation
-        text = re.sub(self.patterns['special_chars'], '', text)
+        text = self.patterns['special_chars'].sub('', text)
         
         return text.strip()
 
     def remove_boilerplate(self, text: str) -> str:
         """Remove common press release boilerplate content"""
         # Remove image captions
-        text = re.sub(self.patterns['image_captions'], '', text)
+        text = self.patterns['image_captions'].sub('', text)
         
         # Remove URLs
-        text = re.sub(self.patterns['urls'], '', text)
+        text = self.patterns['urls'].sub('', text)
         
         # Remove email addresses
-        text = re.sub(self.patterns['email'], '', text)
+        text = self.patterns['email'].sub('', text)
         
         # Remove common press release endings
-        text = re.sub(r'(?i)For more information.*$', '', text)
-        text = re.sub(r'(?i)About .*\n.*$', '', text)
+        text = self.patterns['more_information'].sub('', text)
+        text = self.patterns['about_footer'].sub('', text)
         
         return text.strip()
 
@@ -133,34 +265,32 @@ class PressReleasePreprocessor:
         text = self.remove_boilerplate(text)
         return text.strip()
 
-    def extract_sections(self, text: str) -> Dict[str, str]:
+    def extract_sections(self, text: str, doc=None) -> Dict[str, str]:
         """Extract specific sections based on keywords"""
-        doc = self.nlp(text)
-        sections = {}
+        doc = doc if doc is not None else self.nlp(text)
+        relevant_sentences = {section_type: [] for section_type in self.section_keywords}
         
         # Split into sentences
         sentences = list(doc.sents)
         
-        for section_type, keywords in self.section_keywords.items():
-            relevant_sentences = []
-            for i, sent in enumerate(sentences):
-                sent_text = sent.text.lower()
-                
-                # Check if sentence contains relevant keywords
-                if any(keyword in sent_text for keyword in keywords):
-                    # Include the sentence and potentially the next one for context
-                    relevant_sentences.append(sent.text)
-                    if i + 1 < len(sentences):
-                        relevant_sentences.append(sentences[i + 1].text)
-            
-            if relevant_sentences:
-                sections[section_type] = ' '.join(relevant_sentences).strip()
-                
-        return sections
+        # Label every sentence with all of its sections in a single pass
+        for i, labels in enumerate(self._label_sentences(text, sentences)):
+            sent = sentences[i]
+            for section_type in labels:
+                # Include the sentence and potentially the next one for context
+                relevant_sentences[section_type].append(sent.text)
+                if i + 1 < len(sentences):
+                    relevant_sentences[section_type].append(sentences[i + 1].text)
+        
+        return {
+            section_type: ' '.join(texts).strip()
+            for section_type, texts in relevant_sentences.items()
+            if texts
+        }
 
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def extract_entities(self, text: str, doc=None) -> Dict[str, List[str]]:
         """Extract named entities from the text"""
-        doc = self.nlp(text)
+        doc = doc if doc is not None else self.nlp(text)
         entities = {
             'organizations': [],
             'people': [],
@@ -187,12 +317,13 @@ class PressReleasePreprocessor:
             
         return entities
 
-    def generate_metadata(self, text: str, sections: Dict[str, str], entities: Dict[str, List[str]]) -> Dict:
+    def generate_metadata(self, text: str, sections: Dict[str, str], entities: Dict[str, List[str]],
+                          doc=None) -> Dict:
         """
         Generate metadata from the processed text.
         Ensures all values are ChromaDB-compatible (str, int, float, or bool)
         """
-        doc = self.nlp(text)
+        doc = doc if doc is not None else self.nlp(text)
         
         metadata = {
             'word_count': len(text.split()),
@@ -215,50 +346,264 @@ class PressReleasePreprocessor:
         
         return metadata
 
-    def clean_and_preprocess(self, text: str) -> ProcessedDocument:
-        """Main preprocessing pipeline"""
-        # Clean the text
-        clean_text = self.clean_text(text)
-        
+    def _build_document(self, clean_text: str, doc) -> ProcessedDocument:
+        """Run every extraction step over one parsed ``Doc``"""
         # Extract sections
-        sections = self.extract_sections(clean_text)
+        sections = self.extract_sections(clean_text, doc)
         
         # Extract entities
-        entities = self.extract_entities(clean_text)
+        entities = self.extract_entities(clean_text, doc)
         
         # Generate metadata (compatible with ChromaDB)
-        metadata = self.generate_metadata(clean_text, sections, entities)
+        metadata = self.generate_metadata(clean_text, sections, entities, doc)
         
         return ProcessedDocument(
             clean_text=clean_text,
             key_sections=sections,
             extracted_entities=entities,
-            metadata=metadata
+            metadata=metadata,
+            passages=self.split_passages(doc)
         )
 
+    def split_passages(self, doc) -> List[str]:
+        """
+        Split a parsed document into passages of whole sentences.
+
+        Sentences are packed until a passage would exceed ``passage_words``
+        words; a longer sentence becomes a passage on its own.
+        """
+        passages = []
+        current: List[str] = []
+        current_words = 0
+        for sent in doc.sents:
+            text = sent.text.strip()
+            words = len(text.split())
+            if not words:
+                continue
+            if current and current_words + words > self.passage_words:
+                passages.append(' '.join(current))
+                current, current_words = [], 0
+            current.append(text)
+            current_words += words
+        if current:
+            passages.append(' '.join(current))
+        return passages
+
+    def clean_and_preprocess(self, text: str) -> ProcessedDocument:
+        """Main preprocessing pipeline"""
+        # Clean the text, then parse it once for all the steps
+        clean_text = self.clean_text(text)
+        return self._build_document(clean_text, self.nlp(clean_text))
+
+    def preprocess_batch(self, texts: List[str]) -> List[ProcessedDocument]:
+        """
+        Preprocess several documents at once.
+
+        Documents are parsed together through ``nlp.pipe`` (across
+        ``n_process`` processes), which is much faster than one ``nlp`` call
+        per document.
+        """
+        clean_texts = [self.clean_text(text) for text in texts]
+        docs = self.nlp.pipe(clean_texts, batch_size=self.batch_size, n_process=self.n_process)
+        return [self._build_document(clean_text, doc) for clean_text, doc in zip(clean_texts, docs)]
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute governor shared by worker threads.
+
+    Both budgets refill continuously; ``acquire`` blocks until there is room
+    for one more request of the given size.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def acquire(self, tokens: int):
+        # A request larger than the whole budget only has to wait for a full bucket
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute
+                )
+            time.sleep(max(wait, 0.01))
+
 class OpenAIEmbeddings:
     """Handles creation of embeddings using OpenAI's API"""
-    
-    @retry(wait=wait_exponential(min=1, max=60), stop=stop_after_attempt(5))
+
+    model = "text-embedding-ada-002"
+
+    def __init__(self,
+                 cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = EMBEDDING_BATCH_SIZE,
+                 batch_tokens: int = EMBEDDING_BATCH_TOKENS,
+                 max_concurrency: int = EMBEDDING_CONCURRENCY,
+                 rate_limiter: Optional[RateLimiter] = None):
+        # Shares its on-disk tier with the API workers, so re-indexing
+        # unchanged text never hits the API again
+        self.cache = cache or EmbeddingCache()
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter or RateLimiter(EMBEDDING_RPM, EMBEDDING_TPM)
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # Roughly four characters per token for English prose
+        return len(text) // 4 + 1
+
     def create_embedding(self, text: str) -> List[float]:
         """Create embedding using OpenAI's ada-002 model"""
+        return self.create_embeddings([text])[0]
+
+    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Create embeddings for many texts, in input order.
+
+        Cached texts are served from the cache. The rest are packed into
+        requests of up to ``batch_size`` texts and ``batch_tokens`` estimated
+        tokens, which run concurrently under the rate limiter.
+        """
+        embeddings: List[Optional[List[float]]] = [self.cache.get(self.model, text) for text in texts]
+        pending = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        if pending:
+            fresh = {}
+            batches = self._pack_batches(pending)
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                for batch, batch_embeddings in zip(batches, executor.map(self._embed_batch, batches)):
+                    for text, embedding in zip(batch, batch_embeddings):
+                        self.cache.set(self.model, text, embedding)
+                        fresh[text] = embedding
+            embeddings = [embedding if embedding is not None else fresh[text] for text, embedding in zip(texts, embeddings)]
+        return embeddings
+
+    def _pack_batches(self, texts: List[str]) -> List[List[str]]:
+        batches, batch, batch_tokens = [], [], 0
+        for text in texts:
+            tokens = self.estimate_tokens(text)
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.batch_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self.rate_limiter.acquire(sum(self.estimate_tokens(text) for text in texts))
+        return self._request_embeddings(texts)
+
+    @retry(wait=wait_exponential(min=1, max=60), stop=stop_after_attempt(5))
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
         try:
             response = openai.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text
+                model=self.model,
+                input=texts
             )
-            return response.data[0].embedding
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
         except Exception as e:
-            logger.error(f"Error creating embedding: {str(e)}")
+            logger.error(f"Error creating embeddings for a batch of {len(texts)}: {str(e)}")
             raise
 
+class CompanyProfileExtractor:
+    """Extracts a structured company profile from a press release using GPT-4"""
+
+    model = "gpt-4"
+    # Press releases lead with the announcement; the rest rarely changes the profile
+    max_input_chars = 8000
+
+    def __init__(self, concurrency: int = PROFILE_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+
+    def extract_many(self, processed_docs: List[ProcessedDocument]) -> List[Dict]:
+        """Profiles for several documents, with up to ``concurrency`` requests in flight"""
+        if len(processed_docs) <= 1 or self.concurrency == 1:
+            return [self.extract(processed_doc) for processed_doc in processed_docs]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(processed_docs))) as executor:
+            return list(executor.map(self.extract, processed_docs))
+
+    def extract(self, processed_doc: ProcessedDocument) -> Dict:
+        """Return a profile with every field in PROFILE_FIELDS, falling back to spaCy output"""
+        try:
+            profile = self._request_profile(processed_doc.clean_text[:self.max_input_chars])
+        except Exception as e:
+            logger.error(f"Error extracting company profile: {str(e)}")
+            profile = {}
+        if not isinstance(profile, dict):
+            logger.error(f"Company profile is not a JSON object: {type(profile).__name__}")
+            profile = {}
+        fallback = self._fallback_profile(processed_doc)
+        return {field: profile.get(field) or fallback[field] for field in PROFILE_FIELDS}
+
+    @retry(wait=wait_exponential(min=1, max=60), stop=stop_after_attempt(3))
+    def _request_profile(self, text: str) -> Dict:
+        prompt = f"""
+        Extract a structured company profile for the startup this press release is about.
+
+        PRESS RELEASE:
+        {text}
+
+        Return ONLY a valid JSON object with no additional text, using this exact format:
+        {{
+            "company_name": "<company name>",
+            "description": "<what the company does, in 1-2 sentences>",
+            "industry": "<primary industry, e.g. FinTech, AI/ML, HealthTech>",
+            "stage": "<funding stage, e.g. Seed, Series A, or empty if unknown>",
+            "locations": ["<headquarters and office locations>"],
+            "funding": "<latest round amount and lead investors, or empty if unknown>"
+        }}
+        """
+        response = openai.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You extract structured company data from press releases. Always respond with valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0
+        )
+        return json.loads(response.choices[0].message.content)
+
+    @staticmethod
+    def _fallback_profile(processed_doc: ProcessedDocument) -> Dict:
+        entities = processed_doc.extracted_entities
+        sections = processed_doc.key_sections
+        return {
+            'company_name': entities['organizations'][0] if entities['organizations'] else '',
+            'description': sections.get('company_description', '')[:300],
+            'industry': '',
+            'stage': '',
+            'locations': entities['locations'][:3],
+            'funding': sections.get('funding_info', '')[:300],
+        }
+
 class ChromaDBManager:
     """Manages ChromaDB operations"""
     
     def __init__(self, 
                  collection_name: str,
                  persist_dir: str = "./chroma_db",
-                 is_persistent: bool = True):
+                 is_persistent: bool = True,
+                 write_batch_size: int = CHROMA_WRITE_BATCH_SIZE,
+                 on_flush: Optional[Callable[[List[str]], None]] = None):
         if is_persistent:
             self.client = chromadb.PersistentClient(
                 path=persist_dir
@@ -273,6 +618,18 @@ class ChromaDBManager:
             name=collection_name,
             metadata={"hnsw:space": "cosine"}
         )
+        self.write_batch_size = max(1, write_batch_size)
+        # Called with the ids of every bulk write that reached the collection
+        self.on_flush = on_flush
+        # doc_id -> (embedding, metadata, text); a re-added id replaces the pending write
+        self._pending: Dict[str, Tuple[List[float], Dict, str]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _sanitize_metadata(self, metadata: Dict) -> Dict:
         """Ensure metadata only contains ChromaDB-compatible types"""
@@ -293,12 +650,12 @@ class ChromaDBManager:
                       embedding: List[float], 
                       metadata: Dict, 
                       text: str):
-        """Store document in ChromaDB"""
+        """Store document in ChromaDB, replacing any existing document with the same id"""
         try:
             # Sanitize metadata before storing
             clean_metadata = self._sanitize_metadata(metadata)
             
-            self.collection.add(
+            self.collection.upsert(
                 ids=[doc_id],
                 embeddings=[embedding],
                 metadatas=[clean_metadata],
@@ -308,20 +665,263 @@ class ChromaDBManager:
             logger.error(f"Error storing document {doc_id}: {str(e)}")
             raise
 
+    def add_document(self,
+                     doc_id: str,
+                     embedding: List[float],
+                     metadata: Dict,
+                     text: str):
+        """Buffer a document and write it with the next bulk upsert"""
+        with self._lock:
+            self._pending[doc_id] = (embedding, self._sanitize_metadata(metadata), text)
+            should_flush = len(self._pending) >= self.write_batch_size
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Upsert every buffered document in one call"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        ids = list(pending)
+        try:
+            self.collection.upsert(
+                ids=ids,
+                embeddings=[pending[doc_id][0] for doc_id in ids],
+                metadatas=[pending[doc_id][1] for doc_id in ids],
+                documents=[pending[doc_id][2] for doc_id in ids]
+            )
+            written = ids
+        except Exception as e:
+            # Retry one by one so a single bad document doesn't lose the batch
+            logger.error(f"Error storing batch of {len(ids)} documents, retrying individually: {str(e)}")
+            written = []
+            for doc_id in ids:
+                embedding, metadata, text = pending[doc_id]
+                try:
+                    self.store_document(doc_id, embedding, metadata, text)
+                    written.append(doc_id)
+                except Exception:
+                    pass  # already logged by store_document
+        if written and self.on_flush is not None:
+            self.on_flush(written)
+
+    def get_metadatas(self, doc_ids: List[str]) -> Dict[str, Dict]:
+        """Stored metadata of the given documents that are already in the collection"""
+        if not doc_ids:
+            return {}
+        result = self.collection.get(ids=list(doc_ids), include=["metadatas"])
+        return dict(zip(result["ids"], result["metadatas"]))
+
+    def delete_documents(self, doc_ids: List[str]):
+        if doc_ids:
+            self.collection.delete(ids=list(doc_ids))
+
+    def delete_by_parent(self, parent_ids: List[str]):
+        """Delete the passages of the given parent documents"""
+        if parent_ids:
+            self.collection.delete(where={"parent_id": {"$in": list(parent_ids)}})
+
+    def delete_passages_from(self, parent_id: str, count: int):
+        """Delete the passages of ``parent_id`` numbered ``count`` and up"""
+        result = self.collection.get(where={"parent_id": parent_id}, include=["metadatas"])
+        stale = [
+            passage_id for passage_id, metadata in zip(result["ids"], result["metadatas"])
+            if (metadata or {}).get("passage_index", 0) >= count
+        ]
+        self.delete_documents(stale)
+
+    def close(self):
+        """Write anything still buffered"""
+        self.flush()
+
+class IndexManifest:
+    """
+    Record of indexed files, kept in a small SQLite file.
+
+    Each file path maps to the document id it was indexed under (which
+    embeds a hash of its content) plus its mtime and size at the time, so an
+    unchanged file can be recognised from a ``stat`` alone. Entries are only
+    written once the document has reached ChromaDB, which makes the manifest
+    a checkpoint an interrupted run can resume from.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS manifest ("
+            "path TEXT PRIMARY KEY, doc_id TEXT NOT NULL, mtime REAL NOT NULL, "
+            "size INTEGER NOT NULL, indexed_at TEXT NOT NULL)"
+        )
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT doc_id, mtime, size FROM manifest WHERE path = ?", (path,)
+            ).fetchone()
+        return {'doc_id': row[0], 'mtime': row[1], 'size': row[2]} if row else None
+
+    def entries(self) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT path, doc_id, mtime, size FROM manifest").fetchall()
+        return {path: {'doc_id': doc_id, 'mtime': mtime, 'size': size} for path, doc_id, mtime, size in rows}
+
+    def record(self, path: str, doc_id: str, mtime: float, size: int):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO manifest (path, doc_id, mtime, size, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (path, doc_id, mtime, size, str(datetime.now()))
+            )
+            self.conn.commit()
+
+    def remove(self, path: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM manifest WHERE path = ?", (path,))
+            self.conn.commit()
+
+# Preprocessor of a pipelined-mode worker process, loaded once per process
+_worker_preprocessor: Optional[PressReleasePreprocessor] = None
+
+def _init_preprocess_worker():
+    global _worker_preprocessor
+    _worker_preprocessor = PressReleasePreprocessor()
+
+def _extract_and_preprocess(pdf_path: Path) -> Tuple[Path, str, Optional[ProcessedDocument], float]:
+    """Extract and preprocess one PDF in a worker process; also returns the seconds it took"""
+    started = time.perf_counter()
+    raw_text = PDFExtractor.extract_text_from_pdf(pdf_path)
+    processed_doc = None
+    if raw_text:
+        try:
+            processed_doc = _worker_preprocessor.clean_and_preprocess(raw_text)
+        except Exception as e:
+            logger.error(f"Error preprocessing document {pdf_path}: {str(e)}")
+    return pdf_path, raw_text, processed_doc, time.perf_counter() - started
+
+class PipelineStats:
+    """Documents handled and busy time per stage of the pipelined indexer"""
+
+    STAGES = ('preprocess', 'embed', 'write')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counts = {stage: 0 for stage in self.STAGES}
+        self.busy = {stage: 0.0 for stage in self.STAGES}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, documents: int, seconds: float):
+        with self._lock:
+            self.counts[stage] += documents
+            self.busy[stage] += seconds
+
+    def summary(self, cpu_workers: int, io_workers: int) -> List[str]:
+        """One line per stage; utilization is busy time over the stage's worker time"""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        workers = {'preprocess': cpu_workers, 'embed': io_workers, 'write': 1}
+        lines = [f"Pipeline finished in {elapsed:.1f}s"]
+        for stage in self.STAGES:
+            utilization = self.busy[stage] / (elapsed * workers[stage])
+            lines.append(
+                f"  {stage}: {self.counts[stage]} docs, {self.counts[stage] / elapsed:.2f} docs/s, "
+                f"{self.busy[stage]:.1f}s busy across {workers[stage]} workers ({utilization:.0%} utilized)"
+            )
+        return lines
+
 class PressReleaseProcessor:
     """Main class orchestrating the press release processing pipeline"""
     
-    def __init__(self):
+    def __init__(self,
+                 n_process: int = SPACY_N_PROCESS,
+                 batch_size: int = SPACY_BATCH_SIZE,
+                 manifest: Optional[IndexManifest] = None,
+                 passages: bool = INDEX_PASSAGES):
         self.pdf_extractor = PDFExtractor()
-        self.preprocessor = PressReleasePreprocessor()
+        self.preprocessor = PressReleasePreprocessor(n_process=n_process, batch_size=batch_size)
         self.embeddings = OpenAIEmbeddings()
-        self.db = ChromaDBManager("startup_press_releases")
+        self.profiles = CompanyProfileExtractor()
+        self.manifest = manifest
+        # doc_id -> (path, mtime, size, replaced doc_id) until its write is flushed
+        self._unrecorded: Dict[str, Tuple[str, float, int, Optional[str]]] = {}
+        # doc_id -> passage count of a document re-indexed in place; its
+        # leftover passages are deleted once the new ones are written
+        self._passage_counts: Dict[str, int] = {}
+        self.db = ChromaDBManager("startup_press_releases", on_flush=self._record_written)
+        # Passages are buffered separately and always flushed before their parents
+        self.passage_db = ChromaDBManager(PASSAGE_COLLECTION_NAME) if passages else None
+
+    @staticmethod
+    def _manifest_key(pdf_path: Path) -> str:
+        return str(Path(pdf_path).resolve())
+
+    def _record_written(self, doc_ids: List[str]):
+        """Checkpoint flushed documents and drop the vectors of the versions they replace"""
+        if self.passage_db is not None:
+            # A document only counts as indexed once its passages are written too
+            self.passage_db.flush()
+        replaced = []
+        for doc_id in doc_ids:
+            count = self._passage_counts.pop(doc_id, None)
+            if count is not None:
+                self.passage_db.delete_passages_from(doc_id, count)
+            entry = self._unrecorded.pop(doc_id, None)
+            if entry is None or self.manifest is None:
+                continue
+            path, mtime, size, previous_id = entry
+            self.manifest.record(path, doc_id, mtime, size)
+            if previous_id and previous_id != doc_id:
+                replaced.append(previous_id)
+        if replaced:
+            logger.info(f"Removing {len(replaced)} replaced documents")
+            self.db.delete_documents(replaced)
+            if self.passage_db is not None:
+                self.passage_db.delete_by_parent(replaced)
+
+    def _is_unchanged(self, pdf_path: Path) -> bool:
+        """Fast pre-check: same size and mtime as when the file was last indexed"""
+        entry = self.manifest.get(self._manifest_key(pdf_path)) if self.manifest else None
+        if entry is None:
+            return False
+        stat = pdf_path.stat()
+        return entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size
+
+    def remove_deleted(self, pdf_files: List[Path], directory_path: str) -> List[str]:
+        """Delete the vectors of manifest files under ``directory_path`` that no longer exist"""
+        if self.manifest is None:
+            return []
+        present = {self._manifest_key(pdf_path) for pdf_path in pdf_files}
+        root = str(Path(directory_path).resolve())
+        removed = []
+        for path, entry in self.manifest.entries().items():
+            if path.startswith(root + os.sep) and path not in present:
+                removed.append(entry['doc_id'])
+                self.db.delete_documents([entry['doc_id']])
+                if self.passage_db is not None:
+                    self.passage_db.delete_by_parent([entry['doc_id']])
+                self.manifest.remove(path)
+        if removed:
+            logger.info(f"Removed {len(removed)} documents whose files were deleted")
+        return removed
         
     def generate_doc_id(self, file_path: str, content: str) -> str:
         """Generate a unique document ID"""
         content_hash = hashlib.md5(content.encode()).hexdigest()
         return f"{Path(file_path).stem}_{content_hash[:8]}"
 
+    def _same_content(self, pdf_path: Path, raw_text: str) -> bool:
+        """True if a touched file still has the content it was indexed with; refreshes its stat"""
+        key = self._manifest_key(pdf_path)
+        entry = self.manifest.get(key) if self.manifest else None
+        if entry is None or entry['doc_id'] != self.generate_doc_id(str(pdf_path), raw_text):
+            return False
+        stat = pdf_path.stat()
+        self.manifest.record(key, entry['doc_id'], stat.st_mtime, stat.st_size)
+        return True
+
     def process_single_document(self, pdf_path: Path) -> Optional[str]:
         """Process a single press release document"""
         try:
@@ -330,25 +930,73 @@ class PressReleaseProcessor:
             if not raw_text:
                 return None
 
-            # Generate document ID
-            doc_id = self.generate_doc_id(str(pdf_path), raw_text)
-
             # Preprocess text
             processed_doc = self.preprocessor.clean_and_preprocess(raw_text)
 
+            doc_id = self._index_document(pdf_path, raw_text, processed_doc)
+            self.db.flush()
+            return doc_id
+
+        except Exception as e:
+            logger.error(f"Error processing document {pdf_path}: {str(e)}")
+            return None
+
+    def _index_document(self, pdf_path: Path, raw_text: str, processed_doc: ProcessedDocument,
+                        embedding: Optional[List[float]] = None,
+                        profile: Optional[Dict] = None,
+                        passage_embeddings: Optional[List[List[float]]] = None) -> Optional[str]:
+        """Embed and profile (unless already given) and store an already preprocessed document"""
+        try:
+            # Generate document ID
+            doc_id = self.generate_doc_id(str(pdf_path), raw_text)
+
             # Create embedding
-            embedding = self.embeddings.create_embedding(processed_doc.clean_text)
+            if embedding is None:
+                embedding = self.embeddings.create_embedding(processed_doc.clean_text)
+
+            # Structured profile, so matching doesn't have to extract it per query
+            if profile is None:
+                profile = self._profiles_for([(pdf_path, raw_text, processed_doc)])[0]
 
             # Prepare metadata
             metadata = {
                 "filename": pdf_path.name,
                 "processed_date": str(datetime.now()),
                 **processed_doc.metadata,
+                **profile_to_metadata(profile),
                 "entities": processed_doc.extracted_entities
             }
 
-            # Store in ChromaDB
-            self.db.store_document(
+            key = self._manifest_key(pdf_path)
+            stat = pdf_path.stat()
+            previous = self.manifest.get(key) if self.manifest else None
+
+            # Passages go first, so they are buffered before the parent's write can be flushed
+            if self.passage_db is not None and previous and previous['doc_id'] == doc_id:
+                # Re-indexing the same content; the upserts below overwrite the passages
+                # that still exist, and any beyond the new count go after the flush
+                self._passage_counts[doc_id] = len(processed_doc.passages)
+            if self.passage_db is not None and processed_doc.passages:
+                if passage_embeddings is None:
+                    passage_embeddings = self.embeddings.create_embeddings(processed_doc.passages)
+                for idx, (passage, passage_embedding) in enumerate(zip(processed_doc.passages, passage_embeddings)):
+                    self.passage_db.add_document(
+                        doc_id=f"{doc_id}_p{idx}",
+                        embedding=passage_embedding,
+                        metadata={
+                            "parent_id": doc_id,
+                            "passage_index": idx,
+                            "filename": pdf_path.name,
+                            "profile_company_name": profile.get('company_name') or ''
+                        },
+                        text=passage
+                    )
+
+            # Checkpointed in the manifest once the write is flushed
+            self._unrecorded[doc_id] = (key, stat.st_mtime, stat.st_size, previous['doc_id'] if previous else None)
+
+            # Buffer for the next bulk write to ChromaDB
+            self.db.add_document(
                 doc_id=doc_id,
                 embedding=embedding,
                 metadata=metadata,
@@ -361,31 +1009,362 @@ class PressReleaseProcessor:
             logger.error(f"Error processing document {pdf_path}: {str(e)}")
             return None
 
-    def process_directory(self, directory_path: str):
-        """Process all PDF files in a directory"""
-        pdf_files = list(Path(directory_path).glob("*.pdf"))
-        logger.info(f"Found {len(pdf_files)} PDF files to process")
+    def _profiles_for(self, items: List[Tuple[Path, str, ProcessedDocument]]) -> List[Dict]:
+        """
+        Company profiles for ``(pdf_path, raw_text, processed_doc)`` items.
+
+        A document id is a hash of its content, so a document already stored
+        under the same id (re-indexed with --full, say) keeps its stored
+        profile. The rest are extracted concurrently.
+        """
+        doc_ids = [self.generate_doc_id(str(pdf_path), raw_text) for pdf_path, raw_text, _ in items]
+        try:
+            stored = self.db.get_metadatas(doc_ids)
+        except Exception as e:
+            logger.error(f"Error reading stored profiles: {str(e)}")
+            stored = {}
+        profiles = [profile_from_metadata(stored.get(doc_id)) for doc_id in doc_ids]
+        missing = [idx for idx, profile in enumerate(profiles) if profile is None]
+        if len(missing) < len(items):
+            logger.info(f"Reusing {len(items) - len(missing)} stored company profiles")
+        extracted = self.profiles.extract_many([items[idx][2] for idx in missing])
+        for idx, profile in zip(missing, extracted):
+            profiles[idx] = profile
+        return profiles
+
+    def _texts_to_embed(self, processed_docs: List[ProcessedDocument]) -> List[str]:
+        """Document texts, plus their passages when indexing passages, for one embedding batch"""
+        texts = [processed_doc.clean_text for processed_doc in processed_docs]
+        if self.passage_db is not None:
+            texts.extend(passage for processed_doc in processed_docs for passage in processed_doc.passages)
+        return texts
+
+    def _passage_embeddings(self, processed_doc: ProcessedDocument,
+                            embeddings: Dict[str, List[float]]) -> Optional[List[List[float]]]:
+        """A document's passage embeddings from a batch, or None if any is missing"""
+        if self.passage_db is None or any(passage not in embeddings for passage in processed_doc.passages):
+            return None
+        return [embeddings[passage] for passage in processed_doc.passages]
+
+    def close(self):
+        """Write everything still buffered"""
+        self.db.close()
+        if self.passage_db is not None:
+            self.passage_db.close()
+
+    def _files_to_process(self, directory_path: str, full: bool, remove_deleted: bool) -> List[Path]:
+        all_files = list(Path(directory_path).glob("*.pdf"))
+        logger.info(f"Found {len(all_files)} PDF files")
+        if remove_deleted:
+            self.remove_deleted(all_files, directory_path)
+        pdf_files = all_files if full else [pdf_path for pdf_path in all_files if not self._is_unchanged(pdf_path)]
+        logger.info(f"{len(pdf_files)} PDF files to process, {len(all_files) - len(pdf_files)} unchanged")
+        return pdf_files
+
+    def process_directory(self, directory_path: str, full: bool = False, remove_deleted: bool = True):
+        """
+        Process all PDF files in a directory.
+
+        With a manifest, files indexed by an earlier (possibly interrupted)
+        run are skipped unless they changed, changed files replace their old
+        document, and files that were deleted have their documents removed.
+        ``full`` reprocesses everything regardless.
+        """
+        pdf_files = self._files_to_process(directory_path, full, remove_deleted)
 
         processed_ids = []
-        with tqdm(total=len(pdf_files)) as pbar:
-            for pdf_path in pdf_files:
-                doc_id = self.process_single_document(pdf_path)
+        batch_size = self.preprocessor.batch_size
+        try:
+            with tqdm(total=len(pdf_files)) as pbar:
+                for start in range(0, len(pdf_files), batch_size):
+                    batch = []
+                    for pdf_path in pdf_files[start:start + batch_size]:
+                        raw_text = self.pdf_extractor.extract_text_from_pdf(pdf_path)
+                        if raw_text and not full and self._same_content(pdf_path, raw_text):
+                            continue
+                        if raw_text:
+                            batch.append((pdf_path, raw_text))
+
+                    # Parse the whole batch in one nlp.pipe pass
+                    try:
+                        processed_docs = self.preprocessor.preprocess_batch([raw_text for _, raw_text in batch])
+                    except Exception as e:
+                        logger.error(f"Error preprocessing batch, falling back to one document at a time: {str(e)}")
+                        processed_docs = [None] * len(batch)
+
+                    # Embed the whole batch (and its passages) in as few requests as possible
+                    ready = self._texts_to_embed([processed_doc for processed_doc in processed_docs if processed_doc is not None])
+                    try:
+                        embeddings = dict(zip(ready, self.embeddings.create_embeddings(ready)))
+                    except Exception as e:
+                        logger.error(f"Error embedding batch, falling back to one document at a time: {str(e)}")
+                        embeddings = {}
+
+                    # Profile the batch concurrently, reusing profiles of unchanged documents
+                    parsed = [
+                        (pdf_path, raw_text, processed_doc)
+                        for (pdf_path, raw_text), processed_doc in zip(batch, processed_docs)
+                        if processed_doc is not None
+                    ]
+                    profiles = dict(zip((pdf_path for pdf_path, _, _ in parsed), self._profiles_for(parsed)))
+
+                    for (pdf_path, raw_text), processed_doc in zip(batch, processed_docs):
+                        if processed_doc is None:
+                            doc_id = self.process_single_document(pdf_path)
+                        else:
+                            doc_id = self._index_document(
+                                pdf_path, raw_text, processed_doc, embeddings.get(processed_doc.clean_text),
+                                profile=profiles.get(pdf_path),
+                                passage_embeddings=self._passage_embeddings(processed_doc, embeddings)
+                            )
+                        if doc_id:
+                            processed_ids.append(doc_id)
+                    # Write and checkpoint every batch, so an interrupted run loses at most one
+                    self.db.flush()
+                    pbar.update(min(batch_size, len(pdf_files) - start))
+        finally:
+            # Write whatever is still buffered, even if the run fails part way
+            self.close()
+
+        logger.info(f"Successfully processed {len(processed_ids)} documents")
+        logger.info(f"Embedding cache stats: {self.embeddings.cache.stats()}")
+        return processed_ids
+
+    def process_directory_pipelined(self,
+                                    directory_path: str,
+                                    full: bool = False,
+                                    remove_deleted: bool = True,
+                                    cpu_workers: int = PIPELINE_CPU_WORKERS,
+                                    io_workers: int = PIPELINE_IO_WORKERS,
+                                    queue_size: int = PIPELINE_QUEUE_SIZE):
+        """
+        Streaming variant of process_directory with overlapping stages.
+
+        PDF extraction and spaCy preprocessing run in a pool of ``cpu_workers``
+        processes, embedding and profile extraction in ``io_workers`` threads,
+        and a single writer thread feeds ChromaDBManager's bulk upserts.
+        Stages are joined by queues of ``queue_size`` items, so a slow stage
+        holds back the ones before it instead of piling up documents in memory.
+        """
+        pdf_files = self._files_to_process(directory_path, full, remove_deleted)
+        stats = PipelineStats()
+        to_embed: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        to_write: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        processed_ids: List[str] = []
+        done = object()
+        embed_batch_size = max(1, self.preprocessor.batch_size)
+
+        def embed_worker():
+            # The writer waits for a done marker from every embed worker, so
+            # this one sends its marker however it exits
+            try:
+                finished = False
+                while not finished:
+                    batch = [to_embed.get()]
+                    # Take whatever else is already waiting, up to one batch
+                    while len(batch) < embed_batch_size and batch[-1] is not done:
+                        try:
+                            batch.append(to_embed.get_nowait())
+                        except queue.Empty:
+                            break
+                    if batch[-1] is done:
+                        batch.pop()
+                        finished = True
+                    if not batch:
+                        continue
+                    started = time.perf_counter()
+                    try:
+                        texts = self._texts_to_embed([processed_doc for _, _, processed_doc in batch])
+                        try:
+                            embeddings = dict(zip(texts, self.embeddings.create_embeddings(texts)))
+                        except Exception as e:
+                            logger.error(f"Error embedding batch, falling back to one document at a time: {str(e)}")
+                            embeddings = {}
+                        for (pdf_path, raw_text, processed_doc), profile in zip(batch, self._profiles_for(batch)):
+                            to_write.put((
+                                pdf_path, raw_text, processed_doc, embeddings.get(processed_doc.clean_text), profile,
+                                self._passage_embeddings(processed_doc, embeddings)
+                            ))
+                    except Exception as e:
+                        # Keep draining to_embed, or the producer blocks on a full queue
+                        logger.error(f"Error preparing {len(batch)} documents for indexing: {str(e)}")
+                    stats.record('embed', len(batch), time.perf_counter() - started)
+            finally:
+                to_write.put(done)
+
+        def writer(pbar):
+            remaining = io_workers
+            unflushed = 0
+            while remaining:
+                item = to_write.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                started = time.perf_counter()
+                doc_id = self._index_document(*item)
                 if doc_id:
                     processed_ids.append(doc_id)
+                # Write and checkpoint at least once per embedding batch
+                unflushed += 1
+                if unflushed >= embed_batch_size:
+                    self.db.flush()
+                    unflushed = 0
+                stats.record('write', 1, time.perf_counter() - started)
                 pbar.update(1)
+            started = time.perf_counter()
+            self.close()
+            stats.record('write', 0, time.perf_counter() - started)
+
+        def feed(item) -> bool:
+            """Queue ``item`` for embedding; False once no embed worker is left to take it"""
+            while True:
+                try:
+                    to_embed.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    if not any(thread.is_alive() for thread in embed_threads):
+                        return False
+
+        # The embed and writer threads are already running by the time the
+        # pool starts its processes, and forking a threaded process can
+        # deadlock the child
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+        def start_pool() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(max_workers=cpu_workers, initializer=_init_preprocess_worker,
+                                       mp_context=context)
+
+        with tqdm(total=len(pdf_files)) as pbar:
+            embed_threads = [
+                threading.Thread(target=embed_worker, name=f"index-embed-{idx}") for idx in range(io_workers)
+            ]
+            threads = embed_threads + [threading.Thread(target=writer, args=(pbar,), name="index-writer")]
+            for thread in threads:
+                thread.start()
+
+            pool = start_pool()
+            try:
+                pending = deque(pdf_files)
+                # Files that were in the pool when a worker process died; each is
+                # retried on its own, so only the one that kills a worker is skipped
+                suspects: deque = deque()
+                in_flight: Dict = {}
+                while True:
+                    broken = False
+                    if suspects:
+                        if not in_flight:
+                            pdf_path = suspects.popleft()
+                            in_flight[pool.submit(_extract_and_preprocess, pdf_path)] = pdf_path
+                    else:
+                        # Keep at most queue_size documents in the process pool
+                        while pending and len(in_flight) < queue_size:
+                            pdf_path = pending.popleft()
+                            try:
+                                in_flight[pool.submit(_extract_and_preprocess, pdf_path)] = pdf_path
+                            except BrokenProcessPool:
+                                pending.appendleft(pdf_path)
+                                broken = True
+                                break
+                    if not in_flight:
+                        break
+                    if not broken:
+                        finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        isolated = bool(suspects) or len(in_flight) == 1
+                        for future in finished:
+                            pdf_path = in_flight.pop(future)
+                            try:
+                                pdf_path, raw_text, processed_doc, seconds = future.result()
+                            except BrokenProcessPool:
+                                if isolated:
+                                    logger.error(f"Skipping {pdf_path}: its worker process died")
+                                    pbar.update(1)
+                                else:
+                                    suspects.append(pdf_path)
+                                broken = True
+                                continue
+                            except Exception as e:
+                                logger.error(f"Error preprocessing document {pdf_path}: {str(e)}")
+                                pbar.update(1)
+                                continue
+                            stats.record('preprocess', 1, seconds)
+                            if processed_doc is None or (not full and self._same_content(pdf_path, raw_text)):
+                                pbar.update(1)
+                                continue
+                            if not feed((pdf_path, raw_text, processed_doc)):
+                                raise RuntimeError("Every embed worker has stopped")
+                    if broken:
+                        # Every file still in the dead pool is a suspect too
+                        logger.error("A preprocessing worker process died, restarting the pool")
+                        suspects.extend(in_flight.values())
+                        in_flight.clear()
+                        pool.shutdown(wait=True)
+                        pool = start_pool()
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+                # Always let the embed workers and the writer finish, so what was
+                # already preprocessed still gets written and checkpointed
+                for _ in range(io_workers):
+                    if not feed(done):
+                        break
+                for thread in threads:
+                    thread.join()
+
+        # Left over only if every embed worker died before the queue was drained
+        unprocessed = sum(1 for item in list(to_embed.queue) if item is not done)
+        if unprocessed:
+            raise RuntimeError(f"Every embed worker has stopped; {unprocessed} documents were not indexed")
 
         logger.info(f"Successfully processed {len(processed_ids)} documents")
+        for line in stats.summary(cpu_workers, io_workers):
+            logger.info(line)
+        logger.info(f"Embedding cache stats: {self.embeddings.cache.stats()}")
         return processed_ids
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Index startup press releases into ChromaDB")
+    parser.add_argument("--docs-dir", default="./docs", help="Directory of press release PDFs")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH,
+                        help="SQLite manifest of indexed files used for incremental runs")
+    parser.add_argument("--full", action="store_true",
+                        help="Reprocess every file, even ones the manifest says are unchanged")
+    parser.add_argument("--keep-deleted", action="store_true",
+                        help="Keep the documents of files that were deleted from --docs-dir")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Run extraction, embedding and writes as concurrent stages")
+    parser.add_argument("--cpu-workers", type=int, default=PIPELINE_CPU_WORKERS,
+                        help="Processes extracting and preprocessing PDFs in --pipeline mode")
+    parser.add_argument("--io-workers", type=int, default=PIPELINE_IO_WORKERS,
+                        help="Threads embedding and profiling documents in --pipeline mode")
+    parser.add_argument("--queue-size", type=int, default=PIPELINE_QUEUE_SIZE,
+                        help="Capacity of each queue between --pipeline stages")
+    parser.add_argument("--passages", action="store_true", default=INDEX_PASSAGES,
+                        help="Also index each document as passages with their own embeddings")
+    return parser.parse_args(argv)
+
 def main():
     """Main execution function"""
+    args = parse_args()
     try:
         # Initialize processor
-        processor = PressReleaseProcessor()
+        processor = PressReleaseProcessor(manifest=IndexManifest(args.manifest), passages=args.passages)
         
         # Process all documents in the specified directory
-        input_directory = "./docs"
-        processed_ids = processor.process_directory(input_directory)
+        if args.pipeline:
+            processed_ids = processor.process_directory_pipelined(
+                args.docs_dir,
+                full=args.full,
+                remove_deleted=not args.keep_deleted,
+                cpu_workers=args.cpu_workers,
+                io_workers=args.io_workers,
+                queue_size=args.queue_size
+            )
+        else:
+            processed_ids = processor.process_directory(
+                args.docs_dir,
+                full=args.full,
+                remove_deleted=not args.keep_deleted
+            )
         
         # Save processing results
         with open('processing_results.json', 'w') as f:
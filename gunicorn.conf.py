@@ -1,4 +1,7 @@
+import os
+
 bind = "0.0.0.0:10000"
-workers = 1
+# More than one worker needs sessions and job status in SQLite (SESSION_BACKEND=sqlite)
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
 threads = 2
-timeout = 120 
\ No newline at end of file
+timeout = 120
@@ -1,5 +1,17 @@
 from .company_matcher import CompanyMatcherService
 from .outreach_service import OutreachService
+from .embedding_cache import EmbeddingCache
+from .evaluation_cache import EvaluationCache
+from .outreach_cache import OutreachCache
+from .job_queue import JobQueue, QueueFullError
+from .resume_index import ResumeIndex
+from .resume_extraction import (
+    ResumeExtractor, ExtractionError, UploadRetention, create_upload_retention
+)
+from .session_store import (
+    SessionStore, InMemorySessionStore, SQLiteSessionStore, create_session_store
+)
+from .registry import ServiceRegistry, registry
 
 # This makes the services available directly from the package
 # Now you can use:
@@ -11,6 +23,22 @@ from .outreach_service import OutreachService
 __all__ = [
     'CompanyMatcherService',
     'OutreachService',
+    'EmbeddingCache',
+    'EvaluationCache',
+    'OutreachCache',
+    'JobQueue',
+    'QueueFullError',
+    'ResumeIndex',
+    'ResumeExtractor',
+    'ExtractionError',
+    'UploadRetention',
+    'create_upload_retention',
+    'SessionStore',
+    'InMemorySessionStore',
+    'SQLiteSessionStore',
+    'create_session_store',
+    'ServiceRegistry',
+    'registry',
 ]
 
 # Version info
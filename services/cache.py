@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with an optional per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStore:
+    """
+    Key/value table in a local SQLite file.
+
+    The database runs in WAL mode so several gunicorn workers (and the
+    indexer) can read while one of them writes. Entries older than ``ttl``
+    seconds are treated as missing, and once the table grows past
+    ``max_entries`` the oldest entries are pruned.
+    """
+
+    # Pruning scans the table, so only do it every N writes
+    PRUNE_EVERY = 100
+
+    def __init__(self,
+                 path: str,
+                 table: str = "cache",
+                 ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_created_at ON {self.table} (created_at)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl and created_at + self.ttl < time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: bytes):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+        with self._writes_lock:
+            self._writes += 1
+            should_prune = self._writes % self.PRUNE_EVERY == 0
+        if should_prune:
+            self.prune()
+
+    def delete(self, key: str):
+        conn = self._connection()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def prune(self):
+        """Drop expired entries and trim the table down to ``max_entries``"""
+        conn = self._connection()
+        with conn:
+            if self.ttl:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at < ?",
+                    (time.time() - self.ttl,)
+                )
+            if self.max_entries:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def __len__(self) -> int:
+        return self._connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+def _encode_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _decode_json(blob: bytes) -> Any:
+    return json.loads(blob)
+
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional shared SQLiteStore.
+
+    Values are JSON-encoded for the disk tier unless ``encode``/``decode`` are
+    given. Disk hits are promoted into memory. Hit/miss counts per tier are
+    available from ``stats()``.
+    """
+
+    def __init__(self,
+                 path: Optional[str],
+                 table: str,
+                 max_memory_entries: int = 1024,
+                 ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None,
+                 encode: Callable[[Any], bytes] = _encode_json,
+                 decode: Callable[[bytes], Any] = _decode_json):
+        self.memory = LRUCache(max_entries=max_memory_entries, ttl=ttl)
+        self.disk = SQLiteStore(path, table=table, ttl=ttl, max_entries=max_entries) if path else None
+        self._encode = encode
+        self._decode = decode
+        self._stats_lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _record(self, outcome: str):
+        with self._stats_lock:
+            self._stats[outcome] += 1
+
+    def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not None:
+            self._record('memory_hits')
+            return value
+
+        if self.disk is not None:
+            blob = self.disk.get(key)
+            if blob is not None:
+                value = self._decode(blob)
+                self.memory.set(key, value)
+                self._record('disk_hits')
+                return value
+
+        self._record('misses')
+        return None
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, self._encode(value))
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (lookups - stats['misses']) / lookups if lookups else 0.0
+        stats['memory_entries'] = len(self.memory)
+        return stats
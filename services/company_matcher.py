@@ -1,26 +1,144 @@
 from openai import OpenAI
 import chromadb
-from typing import List, Dict
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 import json
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from dotenv import load_dotenv
+import logging
+import math
 import os
+import time
+from .embedding_cache import EmbeddingCache
+from .evaluation_cache import EvaluationCache
+from .company_profile import company_info_from_profile, format_profile, profile_from_metadata
+from .prerank import CandidatePreRanker
+from .request_logging import Preview
+from .metrics import STAGE_LATENCY, timed_llm_call
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+# Part of every evaluation cache key; bump it whenever the evaluation prompts
+# (single and batched share the rubric below) or model change so stale scores
+# are not served
+EVALUATION_PROMPT_VERSION = "2"
+EVALUATION_FIELDS = (
+    'company_name', 'company_description', 'industry_score', 'technical_score',
+    'experience_score', 'growth_score', 'final_score', 'reasoning'
+)
+
+# Scoring steps shared by the single and batched evaluation prompts
+EVALUATION_RUBRIC = """Step 1: Industry Match (35%)
+        - Score 1.0: Exact industry match
+        - Score 0.7: Adjacent industry match
+        - Score 0.5: Same sector different focus
+        - Score 0.0: Different industry
+
+        Step 2: Technical Skills Match (25%)
+        - Score 1.0: Core skills direct match
+        - Score 0.7: Related skills match
+        - Score 0.5: Foundational skills match
+        - Score 0.0: No technical skills match
+
+        Step 3: Experience Level Match (25%)
+        For startup stage:
+        - Mature Stage (50+ employees): 15+ years ideal
+        - Growth Stage (11-50 employees): 6-12 years ideal
+        - Early Stage (1-10 employees): 0-5 years ideal
+        Score accordingly.
+
+        Step 4: Growth Stage Match (15%)
+        - Score 1.0: Full growth match
+        - Score 0.7: Partial growth match
+        - Score 0.5: Basic growth understanding
+        - Score 0.0: No growth match"""
+
+# Evaluation settings (overridable per service instance)
+EVALUATION_MODES = ('sequential', 'concurrent', 'batched')
+DEFAULT_EVAL_MODE = os.getenv("MATCH_EVAL_MODE", "concurrent")
+DEFAULT_EVAL_CONCURRENCY = int(os.getenv("MATCH_EVAL_CONCURRENCY", "4"))
+DEFAULT_EVAL_TIMEOUT = float(os.getenv("MATCH_EVAL_TIMEOUT", "45"))
+DEFAULT_EVAL_BATCH_SIZE = int(os.getenv("MATCH_EVAL_BATCH_SIZE", "6"))
+DEFAULT_EVAL_BATCH_TIMEOUT = float(os.getenv("MATCH_EVAL_BATCH_TIMEOUT", "90"))
+
+# Retrieval pool and LLM shortlist sizes, as multiples of num_matches. Setting
+# MATCH_PRERANK=0 skips local pre-ranking and sends the whole pool to the LLM.
+PRERANK_ENABLED = os.getenv("MATCH_PRERANK", "1") != "0"
+RETRIEVAL_POOL_FACTOR = int(os.getenv("MATCH_RETRIEVAL_POOL_FACTOR", "5"))
+LLM_SHORTLIST_FACTOR = int(os.getenv("MATCH_LLM_SHORTLIST_FACTOR", "2"))
+
+# Sections appended to an indexed company profile when it stands in for the
+# full press release in evaluation prompts, and how much of each to keep
+PROFILE_CONTEXT_SECTIONS = ('product_details', 'technical_info')
+PROFILE_SECTION_MAX_CHARS = 600
+
+# Passage-level retrieval over the collection built by the indexer's
+# --passages mode: passage hits are grouped per company and only each
+# company's best passages are put in evaluation prompts
+PASSAGE_COLLECTION_NAME = "startup_press_release_passages"
+PASSAGES_ENABLED = os.getenv("MATCH_PASSAGES", "0") == "1"
+PASSAGE_POOL_FACTOR = int(os.getenv("MATCH_PASSAGE_POOL_FACTOR", "4"))
+PASSAGES_PER_COMPANY = int(os.getenv("MATCH_PASSAGES_PER_COMPANY", "3"))
+# Evaluations of passage prompts see different text, so they are cached apart
+PASSAGE_EVALUATION_PROMPT_VERSION = f"{EVALUATION_PROMPT_VERSION}-passages"
+
+# Per-match fields kept in sessions (see CompanyMatcherService.compact_matches)
+SESSION_MATCH_FIELDS = (
+    'document_id', 'startup_id', 'final_score', 'company_name', 'company_description',
+    'similarity_score', 'match_reasons'
+)
+
 class CompanyMatcherService:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.chroma_client = chromadb.PersistentClient(
-            path=os.getenv("CHROMA_DB_PATH", "./data/chromadb")
-        )
-        self.collection = self.chroma_client.get_collection("startup_press_releases")
+    def __init__(self,
+                 max_concurrency: Optional[int] = None,
+                 evaluation_timeout: Optional[float] = None,
+                 client: Optional[OpenAI] = None,
+                 collection=None,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 evaluation_cache: Optional[EvaluationCache] = None,
+                 evaluation_mode: Optional[str] = None,
+                 batch_size: Optional[int] = None,
+                 passage_collection=None):
+        # Shared clients can be injected (see services.registry); otherwise
+        # the service builds its own
+        self.client = client or OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.max_concurrency = max(1, max_concurrency or DEFAULT_EVAL_CONCURRENCY)
+        self.evaluation_timeout = evaluation_timeout or DEFAULT_EVAL_TIMEOUT
+        self.evaluation_mode = evaluation_mode or DEFAULT_EVAL_MODE
+        self.batch_size = max(1, batch_size or DEFAULT_EVAL_BATCH_SIZE)
+        self.batch_timeout = DEFAULT_EVAL_BATCH_TIMEOUT
+        self.preranker = CandidatePreRanker() if PRERANK_ENABLED else None
+        if collection is None:
+            self.chroma_client = chromadb.PersistentClient(
+                path=os.getenv("CHROMA_DB_PATH", "./data/chromadb")
+            )
+            collection = self.chroma_client.get_collection("startup_press_releases")
+            if passage_collection is None and PASSAGES_ENABLED:
+                try:
+                    passage_collection = self.chroma_client.get_collection(PASSAGE_COLLECTION_NAME)
+                except Exception as e:
+                    logger.warning('Passage collection unavailable, matching whole documents: %s', str(e))
+        self.collection = collection
+        # None matches against whole-document embeddings
+        self.passage_collection = passage_collection
+        self.embedding_cache = embedding_cache or EmbeddingCache()
+        self.evaluation_cache = evaluation_cache or EvaluationCache()
 
-    def _create_embedding(self, text: str) -> List[float]:
-        response = self.client.embeddings.create(
+    def _request_embedding(self, text: str) -> List[float]:
+        response = timed_llm_call(
+            'embedding',
+            self.client.embeddings.create,
             input=text,
-            model="text-embedding-ada-002"
+            model=EMBEDDING_MODEL
         )
         return response.data[0].embedding
 
+    def _create_embedding(self, text: str) -> List[float]:
+        with STAGE_LATENCY.time(stage='query_embedding'):
+            return self.embedding_cache.get_or_create(EMBEDDING_MODEL, text, self._request_embedding)
+
     def _prepare_search_text(self, resume_text: str, preferences: Dict) -> str:
         # Combine resume and preferences into a single search query
         search_text = f"""
@@ -36,10 +154,10 @@ class CompanyMatcherService:
         prompt = """
         You are evaluating a match between a candidate and a startup.
 
-        First, extract the company name and create a brief description from this potentially unstructured startup information:
+        Startup information (a structured company profile; if it is unstructured text instead, first extract the company name and create a brief description):
         {}
 
-        Then evaluate this startup against:
+        Evaluate this startup against:
 
         RESUME:
         {}
@@ -52,34 +170,11 @@ class CompanyMatcherService:
 
         Evaluate this match using these steps:
 
-        Step 1: Industry Match (35%)
-        - Score 1.0: Exact industry match
-        - Score 0.7: Adjacent industry match
-        - Score 0.5: Same sector different focus
-        - Score 0.0: Different industry
-
-        Step 2: Technical Skills Match (25%)
-        - Score 1.0: Core skills direct match
-        - Score 0.7: Related skills match
-        - Score 0.5: Foundational skills match
-        - Score 0.0: No technical skills match
-
-        Step 3: Experience Level Match (25%)
-        For startup stage:
-        - Mature Stage (50+ employees): 15+ years ideal
-        - Growth Stage (11-50 employees): 6-12 years ideal
-        - Early Stage (1-10 employees): 0-5 years ideal
-        Score accordingly.
-
-        Step 4: Growth Stage Match (15%)
-        - Score 1.0: Full growth match
-        - Score 0.7: Partial growth match
-        - Score 0.5: Basic growth understanding
-        - Score 0.0: No growth match
+        {}
 
         Return ONLY a valid JSON object with no additional text, using this exact format:
         {{
-            "company_name": "<extracted company name>",
+            "company_name": "<company name>",
             "company_description": "<brief 1-2 sentence description>",
             "industry_score": <float between 0 and 1>,
             "technical_score": <float between 0 and 1>,
@@ -94,96 +189,544 @@ class CompanyMatcherService:
             preferences.get('desired_roles', []),
             preferences.get('industries', []),
             preferences.get('work_locations', []),
-            preferences.get('company_stages', [])
+            preferences.get('company_stages', []),
+            EVALUATION_RUBRIC
         )
 
-        response = self.client.chat.completions.create(
+        response = timed_llm_call(
+            'evaluate_match',
+            self.client.chat.completions.create,
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are an expert recruiter evaluating candidate-startup matches. Always respond with valid JSON only."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.3  # Lower temperature for more consistent JSON output
+            temperature=0.3,  # Lower temperature for more consistent JSON output
+            timeout=self.evaluation_timeout
         )
         
         try:
             return json.loads(response.choices[0].message.content)
         except json.JSONDecodeError as e:
-            print(f"JSON Parse Error: {str(e)}")
-            print(f"Raw response: {response.choices[0].message.content}")
+            logger.warning("JSON Parse Error: %s", e)
+            logger.debug("Raw response: %s", Preview(response.choices[0].message.content))
             return {
                 "error": "Failed to parse LLM response",
                 "raw_response": response.choices[0].message.content
             }
 
-    def get_company_matches(self, resume_text: str, preferences: Dict, num_matches: int = 3, min_score: float = 0.6) -> List[Dict]:
-        print("\nDEBUG: Starting company matches search...")
+    def _iter_concurrently(self, tasks: List[Callable[[], object]], timeout: float) -> Iterator[Tuple[int, object]]:
+        """
+        Run evaluation tasks on a bounded thread pool.
+
+        Yields ``(task index, result)`` pairs as each task finishes. A task that
+        raises or does not finish within its time budget yields an error dict
+        instead, so one slow or failed call never holds up the others.
+        """
+        if not tasks:
+            return
+
+        workers = min(self.max_concurrency, len(tasks))
+        # Tasks beyond the pool size queue up, so allow one timeout per wave
+        deadline = timeout * math.ceil(len(tasks) / workers)
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="match-eval")
+        try:
+            futures = {executor.submit(task): idx for idx, task in enumerate(tasks)}
+            try:
+                for future in as_completed(futures, timeout=deadline):
+                    idx = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning("Evaluation %d failed: %s", idx + 1, e)
+                        result = {"error": str(e)}
+                    yield idx, result
+            except FuturesTimeoutError:
+                pending = sorted(futures[f] for f in futures if not f.done())
+                logger.warning("Evaluations %s did not finish within %ss", [idx + 1 for idx in pending], deadline)
+                for idx in pending:
+                    yield idx, {"error": "Evaluation timed out"}
+        finally:
+            # Don't block the request (or an abandoned stream) on stragglers
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_concurrent_evaluations(self, resume_text: str, documents: List[str],
+                                     preferences: Dict) -> Iterator[Tuple[int, Dict]]:
+        """Evaluate each candidate with its own LLM call, in parallel"""
+        tasks = [
+            partial(self._evaluate_match, resume_text=resume_text, startup_info=company, preferences=preferences)
+            for company in documents
+        ]
+        return self._iter_concurrently(tasks, self.evaluation_timeout)
+
+    def _evaluate_batch(self, resume_text: str, documents: List[str], preferences: Dict) -> List[Optional[Dict]]:
+        """
+        Score several candidates in one LLM call.
+
+        Returns one entry per document; entries the model left out or returned
+        malformed are None so the caller can retry them individually.
+        """
+        candidates = "\n\n".join(
+            f"=== CANDIDATE {idx} ===\n{company}" for idx, company in enumerate(documents)
+        )
+        prompt = """
+        You are evaluating matches between one candidate and {} startups.
+
+        Each startup below is a structured company profile; for any given as unstructured text instead, first extract the company name and create a brief description:
+
+        {}
+
+        Evaluate each startup against:
+
+        RESUME:
+        {}
+
+        CANDIDATE PREFERENCES:
+        Desired Role: {}
+        Preferred Industries: {}
+        Preferred Locations: {}
+        Preferred Company Stages: {}
+
+        Evaluate each match independently using these steps:
+
+        {}
+
+        Return ONLY a valid JSON array with no additional text, containing one object per startup in this exact format:
+        [
+            {{
+                "candidate_index": <the CANDIDATE number>,
+                "company_name": "<company name>",
+                "company_description": "<brief 1-2 sentence description>",
+                "industry_score": <float between 0 and 1>,
+                "technical_score": <float between 0 and 1>,
+                "experience_score": <float between 0 and 1>,
+                "growth_score": <float between 0 and 1>,
+                "final_score": <weighted average as float>,
+                "reasoning": "<brief explanation as string>"
+            }}
+        ]
+        """.format(
+            len(documents),
+            candidates,
+            resume_text,
+            preferences.get('desired_roles', []),
+            preferences.get('industries', []),
+            preferences.get('work_locations', []),
+            preferences.get('company_stages', []),
+            EVALUATION_RUBRIC
+        )
+
+        response = timed_llm_call(
+            'evaluate_batch',
+            self.client.chat.completions.create,
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are an expert recruiter evaluating candidate-startup matches. Always respond with valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            timeout=self.batch_timeout
+        )
+        return self._parse_batch_response(response.choices[0].message.content, len(documents))
+
+    @staticmethod
+    def _parse_batch_response(content: str, expected: int) -> List[Optional[Dict]]:
+        evaluations: List[Optional[Dict]] = [None] * expected
+        text = (content or '').strip()
+        # Tolerate a markdown code fence around the array
+        if text.startswith("```"):
+            text = text.strip("`")
+            text = text[text.find("["):]
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning("JSON Parse Error in batch response: %s", e)
+            return evaluations
+        if not isinstance(parsed, list):
+            return evaluations
+
+        for item in parsed:
+            if not isinstance(item, dict):
+                continue
+            idx = item.pop('candidate_index', None)
+            if not isinstance(idx, int) or not 0 <= idx < expected:
+                continue
+            if all(field in item for field in EVALUATION_FIELDS):
+                evaluations[idx] = item
+        return evaluations
+
+    def _iter_batched_evaluations(self, resume_text: str, documents: List[str],
+                                  preferences: Dict) -> Iterator[Tuple[int, Dict]]:
+        """
+        Score candidates ``batch_size`` at a time, so the resume and preferences
+        are sent once per batch instead of once per candidate. Batches run in
+        parallel. A candidate missing from a batch's otherwise valid response
+        falls back to its own evaluation call, within what is left of the
+        batch time budget; candidates of a batch that timed out or failed are
+        reported as errors, so the whole request stays within that budget.
+        """
+        if len(documents) <= 1:
+            yield from self._iter_concurrent_evaluations(resume_text, documents, preferences)
+            return
+        started = time.monotonic()
+
+        chunks = [
+            list(range(start, min(start + self.batch_size, len(documents))))
+            for start in range(0, len(documents), self.batch_size)
+        ]
+        tasks = [
+            partial(self._evaluate_batch, resume_text, [documents[idx] for idx in chunk], preferences)
+            for chunk in chunks
+        ]
+        failed = []
+        for chunk_idx, result in self._iter_concurrently(tasks, self.batch_timeout):
+            chunk = chunks[chunk_idx]
+            if not isinstance(result, list):
+                # Timed out or errored: retrying would only add another full timeout
+                for idx in chunk:
+                    yield idx, result
+                continue
+            for idx, evaluation in zip(chunk, result):
+                if evaluation is None:
+                    failed.append(idx)
+                else:
+                    yield idx, evaluation
+
+        if failed:
+            waves = math.ceil(len(failed) / self.max_concurrency)
+            remaining = self.batch_timeout * math.ceil(len(chunks) / self.max_concurrency) - (time.monotonic() - started)
+            if remaining <= 0:
+                for idx in failed:
+                    yield idx, {"error": "Evaluation timed out"}
+                return
+            logger.info("Batch evaluation missed %d candidates, retrying individually", len(failed))
+            tasks = [
+                partial(self._evaluate_match, resume_text=resume_text, startup_info=documents[idx],
+                        preferences=preferences)
+                for idx in failed
+            ]
+            retries = self._iter_concurrently(tasks, min(self.evaluation_timeout, remaining / waves))
+            for position, evaluation in retries:
+                yield failed[position], evaluation
+
+    def _iter_evaluations(self,
+                          resume_text: str,
+                          document_ids: List[str],
+                          documents: List[str],
+                          preferences: Dict,
+                          evaluation_mode: str = 'concurrent',
+                          prompt_version: str = EVALUATION_PROMPT_VERSION,
+                          resume_hash: Optional[str] = None) -> Iterator[Tuple[int, Dict]]:
+        """
+        Evaluate every candidate, yielding ``(index, evaluation)`` as each is ready.
+
+        Unchanged candidates are served from the evaluation cache first. Only
+        cache misses are sent to the LLM, and only successful evaluations are
+        written back. ``resume_hash`` is the resume's evaluation cache hash
+        when the caller already has it.
+        """
+        resume_hash = resume_hash or self.evaluation_cache.hash_text(resume_text)
+        preferences_hash = self.evaluation_cache.hash_preferences(preferences)
+
+        misses = []
+        for idx, document_id in enumerate(document_ids):
+            cached = self.evaluation_cache.get(
+                resume_hash, document_id, preferences_hash, prompt_version
+            )
+            if cached is not None:
+                yield idx, cached
+            else:
+                misses.append(idx)
+        logger.debug("%d cached evaluations, %d to run", len(documents) - len(misses), len(misses))
+
+        pending = [documents[idx] for idx in misses]
+        if evaluation_mode == 'batched':
+            fresh = self._iter_batched_evaluations(resume_text, pending, preferences)
+        elif evaluation_mode == 'concurrent':
+            fresh = self._iter_concurrent_evaluations(resume_text, pending, preferences)
+        else:
+            fresh = self._iter_sequential_evaluations(resume_text, pending, preferences)
+
+        for position, evaluation in fresh:
+            idx = misses[position]
+            if 'error' not in evaluation and 'final_score' in evaluation:
+                self.evaluation_cache.set(
+                    resume_hash, document_ids[idx], preferences_hash, prompt_version, evaluation
+                )
+            yield idx, evaluation
+
+    def _iter_sequential_evaluations(self, resume_text: str, documents: List[str],
+                                     preferences: Dict) -> Iterator[Tuple[int, Dict]]:
+        for idx, company in enumerate(documents):
+            logger.debug("Evaluating match %d", idx + 1)
+            yield idx, self._evaluate_match(
+                resume_text=resume_text,
+                startup_info=company,
+                preferences=preferences
+            )
+
+    @staticmethod
+    def _candidate_text(document: str, metadata: Optional[Dict], passages: Optional[List[str]] = None) -> str:
+        """
+        What the evaluation prompt sees for one candidate.
+
+        Documents indexed with a company profile are described by the profile
+        plus short product and technical excerpts instead of the full press
+        release; older documents fall back to their raw text. With passage
+        retrieval, the passages that best matched the query replace both the
+        excerpts and the raw text.
+        """
+        profile = profile_from_metadata(metadata)
+        if passages:
+            excerpts = "\n".join(f"- {passage}" for passage in passages)
+            if profile is None:
+                return f"Relevant excerpts:\n{excerpts}"
+            return f"{format_profile(profile)}\nRelevant excerpts:\n{excerpts}"
+        if profile is None:
+            return document
+        parts = [format_profile(profile)]
+        for section in PROFILE_CONTEXT_SECTIONS:
+            text = (metadata.get(section) or '').strip()
+            if text:
+                title = section.replace('_', ' ').title()
+                parts.append(f"{title}: {text[:PROFILE_SECTION_MAX_CHARS]}")
+        return "\n".join(parts)
+
+    def _query_passages(self, query_embedding: List[float], n_results: int) -> Tuple[Dict, Dict[str, List[str]]]:
+        """
+        Retrieve candidates through their passages.
+
+        Passage hits are grouped per company (by indexed company name, or by
+        parent document when there is none). Each company is represented by
+        the parent document of its best passage and ranked by that passage's
+        distance; its ``PASSAGES_PER_COMPANY`` best passages are returned
+        keyed by that document id. The result has the shape of a
+        single-query Chroma result over the document collection.
+        """
+        hits = self.passage_collection.query(
+            query_embeddings=[query_embedding],
+            n_results=n_results * PASSAGE_POOL_FACTOR
+        )
+        companies: Dict[str, Dict] = {}
+        for passage, metadata, distance in zip(hits['documents'][0], hits['metadatas'][0], hits['distances'][0]):
+            metadata = metadata or {}
+            parent_id = metadata.get('parent_id')
+            if not parent_id:
+                continue
+            key = (metadata.get('profile_company_name') or '').strip().lower() or parent_id
+            # Hits come nearest first, so the first one per company is its best
+            company = companies.setdefault(key, {'document_id': parent_id, 'distance': distance, 'passages': []})
+            if len(company['passages']) < PASSAGES_PER_COMPANY:
+                company['passages'].append(passage)
+
+        documents = self.get_documents([company['document_id'] for company in companies.values()])
+        # Passages whose parent is gone (e.g. removed since) are dropped
+        ranked = [company for company in companies.values() if company['document_id'] in documents][:n_results]
+        results = {
+            'ids': [[company['document_id'] for company in ranked]],
+            'documents': [[documents[company['document_id']]['document'] for company in ranked]],
+            'metadatas': [[documents[company['document_id']]['metadata'] for company in ranked]],
+            'distances': [[company['distance'] for company in ranked]],
+        }
+        return results, {company['document_id']: company['passages'] for company in ranked}
+
+    @staticmethod
+    def _select_results(results: Dict, indices: List[int]) -> Dict:
+        """Narrow a single-query Chroma result down to ``indices``, in that order"""
+        selected = {}
+        for key in ('ids', 'documents', 'metadatas', 'distances'):
+            if results.get(key) is not None:
+                selected[key] = [[results[key][0][idx] for idx in indices]]
+        return selected
+
+    @classmethod
+    def compact_matches(cls, response: Dict) -> Dict:
+        """
+        Reduce a matches response to what a session needs to keep.
+
+        Document text and metadata are dropped; they can be reloaded from the
+        collection by document_id with hydrate_matches.
+        """
+        matches = []
+        for match in response.get('matches', []):
+            compact = {field: match.get(field) for field in SESSION_MATCH_FIELDS}
+            metadata = match.get('metadata') or {}
+            profile = profile_from_metadata(metadata)
+            compact['industry'] = (profile['industry'] or None) if profile else metadata.get('industry')
+            matches.append(compact)
+        return {**response, 'matches': matches}
+
+    def hydrate_matches(self, response: Dict) -> Dict:
+        """Inverse of compact_matches: reload startup_info and metadata for each match"""
+        matches = response.get('matches', [])
+        documents = self.get_documents([match['document_id'] for match in matches if match.get('document_id')])
+        hydrated = []
+        for match in matches:
+            document = documents.get(match.get('document_id'), {})
+            hydrated.append({
+                **match,
+                'startup_info': document.get('document'),
+                'metadata': document.get('metadata') or {}
+            })
+        return {**response, 'matches': hydrated}
+
+    def get_documents(self, document_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch document text and metadata for the given ids in one collection read"""
+        if not document_ids:
+            return {}
+        result = self.collection.get(
+            ids=list(dict.fromkeys(document_ids)),
+            include=['documents', 'metadatas']
+        )
+        return {
+            document_id: {
+                'document': result['documents'][idx],
+                'metadata': result['metadatas'][idx]
+            }
+            for idx, document_id in enumerate(result['ids'])
+        }
+
+    def get_company_info(self, document_id: str) -> Optional[Dict]:
+        """Company info from the profile indexed with a document, or None if it has none"""
+        document = self.get_documents([document_id]).get(document_id)
+        if document is None:
+            return None
+        profile = profile_from_metadata(document['metadata'])
+        return company_info_from_profile(profile) if profile else None
+
+    def _build_match_data(self, results: Dict, idx: int, evaluation: Dict) -> Dict:
+        # Indexed profiles are authoritative for the company's name and description
+        profile = profile_from_metadata(results['metadatas'][0][idx]) or {}
+        return {
+            'document_id': results['ids'][0][idx],
+            'startup_id': results['metadatas'][0][idx].get('startup_id'),
+            'final_score': evaluation['final_score'],
+            'company_name': profile.get('company_name') or evaluation['company_name'],
+            'company_description': profile.get('description') or evaluation['company_description'],
+            'similarity_score': results['distances'][0][idx],
+            'startup_info': results['documents'][0][idx],
+            'match_reasons': {
+                'industry_match': evaluation['industry_score'],
+                'technical_match': evaluation['technical_score'],
+                'experience_match': evaluation['experience_score'],
+                'growth_match': evaluation['growth_score'],
+                'reasoning': evaluation['reasoning']
+            },
+            'metadata': results['metadatas'][0][idx]
+        }
+
+    def iter_company_matches(self, resume_text: str, preferences: Dict, num_matches: int = 3, min_score: float = 0.6,
+                             evaluation_mode: Optional[str] = None,
+                             resume_hash: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Run the matching pipeline, yielding progress events as they happen.
+
+        Events are dicts with an ``event`` name and its ``data``:
+        ``retrieval`` once the candidates to evaluate are known, ``match`` for
+        each candidate that clears ``min_score`` as soon as its evaluation
+        finishes, and a final ``summary`` carrying the ranked response that
+        get_company_matches returns. ``resume_hash`` is the resume's text hash
+        from ResumeIndex, which keys the evaluation cache.
+        """
+        evaluation_mode = evaluation_mode or self.evaluation_mode
+        if evaluation_mode not in EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation mode: {evaluation_mode}")
+        logger.debug("Starting company matches search...")
         
         # Prepare search text
         search_text = self._prepare_search_text(resume_text, preferences)
-        print(f"DEBUG: Search text prepared: {search_text[:100]}...")
+        logger.debug("Search text prepared: %s", Preview(search_text, 100))
         
         # Generate embedding
         query_embedding = self._create_embedding(search_text)
-        print("DEBUG: Generated embedding")
+        logger.debug("Generated embedding")
         
         # Search ChromaDB
-        initial_matches = num_matches * 2
-        print(f"DEBUG: Searching for {initial_matches} initial matches...")
+        shortlist_size = num_matches * LLM_SHORTLIST_FACTOR
+        initial_matches = num_matches * RETRIEVAL_POOL_FACTOR if self.preranker else shortlist_size
+        logger.debug("Searching for %d initial matches...", initial_matches)
         
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=initial_matches
-        )
-        print(f"DEBUG: Results: {results}")
-        print(f"DEBUG: Found {len(results['documents'][0])} documents")
+        passages: Dict[str, List[str]] = {}
+        with STAGE_LATENCY.time(stage='chroma_query'):
+            if self.passage_collection is not None:
+                results, passages = self._query_passages(query_embedding, initial_matches)
+            if not passages:
+                results = self.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=initial_matches
+                )
+        logger.debug("Results: %s", Preview(results))
+        logger.debug("Found %d documents", len(results['documents'][0]))
+
+        # Prune the wide retrieval pool to a shortlist before paying for GPT-4
+        if self.preranker and len(results['documents'][0]) > shortlist_size:
+            with STAGE_LATENCY.time(stage='prerank'):
+                keep = self.preranker.rank(resume_text, preferences, results, shortlist_size)
+            results = self._select_results(results, keep)
+            logger.debug("Pre-ranking kept %d candidates: %s", len(keep), results['ids'][0])
         
+        yield {
+            'event': 'retrieval',
+            'data': {
+                'candidates': [
+                    {
+                        'document_id': document_id,
+                        'filename': (results['metadatas'][0][idx] or {}).get('filename'),
+                        'similarity_score': results['distances'][0][idx]
+                    }
+                    for idx, document_id in enumerate(results['ids'][0])
+                ],
+                'count': len(results['ids'][0])
+            }
+        }
+
         # Process and score matches
+        evaluations = self._iter_evaluations(
+            resume_text=resume_text,
+            document_ids=results['ids'][0],
+            documents=[
+                self._candidate_text(document, results['metadatas'][0][idx], passages.get(results['ids'][0][idx]))
+                for idx, document in enumerate(results['documents'][0])
+            ],
+            preferences=preferences,
+            evaluation_mode=evaluation_mode,
+            prompt_version=PASSAGE_EVALUATION_PROMPT_VERSION if passages else EVALUATION_PROMPT_VERSION,
+            resume_hash=resume_hash
+        )
+
         scored_matches = []
-        for idx, company in enumerate(results['documents'][0]):
-            print(f"\nDEBUG: Evaluating match {idx + 1}")
-            #print(f"DEBUG: Company: {company}")
-            # Get LLM evaluation
-            evaluation = self._evaluate_match(
-                resume_text=resume_text,
-                startup_info=company,
-                preferences=preferences
-            )
-            print(f"DEBUG: Evaluation result: {evaluation}")
-            
+        for idx, evaluation in evaluations:
+            logger.debug("Evaluation result %d: %s", idx + 1, evaluation)
+
             # Only include matches that meet the minimum score threshold
             if evaluation.get('final_score', 0) >= min_score:
-                match_data = {
-                    'startup_id': results['metadatas'][0][idx].get('startup_id'),
-                    'final_score': evaluation['final_score'],
-                    'company_name': evaluation['company_name'],
-                    'company_description': evaluation['company_description'],
-                    'similarity_score': results['distances'][0][idx],
-                    'startup_info': company,
-                    'match_reasons': {
-                        'industry_match': evaluation['industry_score'],
-                        'technical_match': evaluation['technical_score'],
-                        'experience_match': evaluation['experience_score'],
-                        'growth_match': evaluation['growth_score'],
-                        'reasoning': evaluation['reasoning']
-                    },
-                    'metadata': results['metadatas'][0][idx]
-                }
+                match_data = self._build_match_data(results, idx, evaluation)
                 scored_matches.append(match_data)
-                print(f"DEBUG: Added match with score {evaluation['final_score']}")
+                logger.debug("Added match with score %s", evaluation['final_score'])
+                yield {'event': 'match', 'data': match_data}
             else:
-                print(f"DEBUG: Match below threshold ({min_score}), skipping")
+                logger.debug("Match below threshold (%s), skipping", min_score)
         
-        print(f"\nDEBUG: Total matches before sorting: {len(scored_matches)}")
+        logger.debug("Total matches before sorting: %d", len(scored_matches))
         # Sort by final_score and limit to requested number of matches
         scored_matches.sort(key=lambda x: x['final_score'], reverse=True)
         scored_matches = scored_matches[:num_matches]
-        print(f"DEBUG: Final matches after filtering: {len(scored_matches)}")
+        logger.debug("Final matches after filtering: %d", len(scored_matches))
         
         response = {
             'matches': scored_matches,
             'count': len(scored_matches),
             'min_score_applied': min_score
         }
-        print(f"DEBUG: Final response structure: {list(response.keys())}")
+        logger.debug("Final response structure: %s", list(response.keys()))
+        yield {'event': 'summary', 'data': response}
+
+    def get_company_matches(self, resume_text: str, preferences: Dict, num_matches: int = 3, min_score: float = 0.6,
+                            evaluation_mode: Optional[str] = None, resume_hash: Optional[str] = None) -> Dict:
+        response = None
+        for event in self.iter_company_matches(resume_text, preferences, num_matches, min_score, evaluation_mode,
+                                               resume_hash):
+            if event['event'] == 'summary':
+                response = event['data']
         return response 
\ No newline at end of file
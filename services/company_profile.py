@@ -0,0 +1,57 @@
+from typing import Dict, List, Optional
+
+# Structured profile the indexer extracts for each press release
+PROFILE_FIELDS = ('company_name', 'description', 'industry', 'stage', 'locations', 'funding')
+# Profiles are stored flattened into Chroma metadata under this prefix
+PROFILE_METADATA_PREFIX = 'profile_'
+
+
+def _as_list(value) -> List[str]:
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [part.strip() for part in str(value or '').split(',') if part.strip()]
+
+
+def profile_to_metadata(profile: Dict) -> Dict[str, str]:
+    """Flatten a profile into ChromaDB-compatible metadata entries"""
+    metadata = {}
+    for field in PROFILE_FIELDS:
+        value = profile.get(field)
+        if field == 'locations':
+            value = ', '.join(_as_list(value))
+        metadata[f'{PROFILE_METADATA_PREFIX}{field}'] = str(value or '').strip()
+    return metadata
+
+
+def profile_from_metadata(metadata: Optional[Dict]) -> Optional[Dict]:
+    """Rebuild the profile stored with a document, or None if it was indexed without one"""
+    metadata = metadata or {}
+    if not metadata.get(f'{PROFILE_METADATA_PREFIX}company_name'):
+        return None
+    profile = {field: metadata.get(f'{PROFILE_METADATA_PREFIX}{field}') or '' for field in PROFILE_FIELDS}
+    profile['locations'] = _as_list(profile['locations'])
+    return profile
+
+
+def format_profile(profile: Dict) -> str:
+    """Compact text rendering of a profile for LLM prompts"""
+    return "\n".join([
+        f"Company Name: {profile['company_name']}",
+        f"Description: {profile['description']}",
+        f"Industry: {profile['industry'] or 'Unknown'}",
+        f"Stage: {profile['stage'] or 'Unknown'}",
+        f"Locations: {', '.join(profile['locations']) or 'Unknown'}",
+        f"Funding: {profile['funding'] or 'Unknown'}",
+    ])
+
+
+def company_info_from_profile(profile: Dict) -> Dict:
+    """Company info in the shape the outreach service expects"""
+    return {
+        'company_name': profile['company_name'],
+        'company_description': profile['description'],
+        'industry': profile['industry'] or None,
+        'stage': profile['stage'],
+        'locations': profile['locations'],
+        'funding': profile['funding'],
+    }
@@ -0,0 +1,61 @@
+import hashlib
+import os
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from .cache import TieredCache
+
+DEFAULT_EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./data/cache/embeddings.sqlite3")
+DEFAULT_EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "2048"))
+# Every distinct query adds an entry, so the disk tier is capped; 0 disables the TTL
+DEFAULT_EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+DEFAULT_EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", "0"))
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings.
+
+    Entries are keyed by a hash of the model name and the exact input text, so
+    identical text is only ever embedded once per model. Lookups go through an
+    in-process LRU first and then a SQLite file that is shared by every worker
+    and by the indexer. Pass ``path=""`` to keep the cache in memory only.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_memory_entries: int = DEFAULT_EMBEDDING_CACHE_MEMORY_ENTRIES,
+                 max_entries: Optional[int] = DEFAULT_EMBEDDING_CACHE_MAX_ENTRIES,
+                 ttl: Optional[float] = DEFAULT_EMBEDDING_CACHE_TTL):
+        path = DEFAULT_EMBEDDING_CACHE_PATH if path is None else path
+        # Stored as packed float32 to keep the file small
+        self.cache = TieredCache(
+            path,
+            table="embeddings",
+            max_memory_entries=max_memory_entries,
+            ttl=ttl,
+            max_entries=max_entries,
+            encode=lambda embedding: array('f', embedding).tobytes(),
+            decode=lambda blob: array('f', blob).tolist()
+        )
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.cache.get(self.make_key(model, text))
+
+    def set(self, model: str, text: str, embedding: List[float]):
+        self.cache.set(self.make_key(model, text), embedding)
+
+    def get_or_create(self, model: str, text: str, create: Callable[[str], List[float]]) -> List[float]:
+        """Return the cached embedding for ``text`` or compute and store it"""
+        embedding = self.get(model, text)
+        if embedding is None:
+            embedding = create(text)
+            self.set(model, text, embedding)
+        return embedding
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from .cache import TieredCache
+
+DEFAULT_EVALUATION_CACHE_PATH = os.getenv("EVALUATION_CACHE_PATH", "./data/cache/evaluations.sqlite3")
+DEFAULT_EVALUATION_CACHE_TTL = float(os.getenv("EVALUATION_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_EVALUATION_CACHE_MAX_ENTRIES = int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "50000"))
+
+
+class EvaluationCache:
+    """
+    Cache of LLM match evaluations.
+
+    An evaluation only depends on the resume, the candidate document, the
+    candidate preferences and the prompt that scored them, so the key is built
+    from a hash of each. Preferences are normalized first, so reordering or
+    re-casing the same choices still hits the cache.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl: Optional[float] = DEFAULT_EVALUATION_CACHE_TTL,
+                 max_entries: Optional[int] = DEFAULT_EVALUATION_CACHE_MAX_ENTRIES):
+        path = DEFAULT_EVALUATION_CACHE_PATH if path is None else path
+        self.cache = TieredCache(
+            path,
+            table="evaluations",
+            ttl=ttl,
+            max_entries=max_entries
+        )
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_preferences(preferences: Dict) -> str:
+        normalized = {}
+        for key, value in (preferences or {}).items():
+            if isinstance(value, list):
+                value = sorted({str(v).strip().lower() for v in value if str(v).strip()})
+            elif isinstance(value, str):
+                value = value.strip().lower()
+            normalized[key] = value
+        payload = json.dumps(normalized, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(resume_hash: str, document_id: str, preferences_hash: str, prompt_version: str) -> str:
+        return f"{prompt_version}:{resume_hash}:{preferences_hash}:{document_id}"
+
+    def get(self, resume_hash: str, document_id: str, preferences_hash: str, prompt_version: str) -> Optional[Dict]:
+        return self.cache.get(self.make_key(resume_hash, document_id, preferences_hash, prompt_version))
+
+    def set(self, resume_hash: str, document_id: str, preferences_hash: str, prompt_version: str, evaluation: Dict):
+        self.cache.set(self.make_key(resume_hash, document_id, preferences_hash, prompt_version), evaluation)
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
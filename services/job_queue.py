@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# A job target receives a callback it can use to report progress
+ProgressCallback = Callable[[Dict], None]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class JobQueue:
+    """
+    Bounded background worker pool for long-running jobs.
+
+    Jobs wait in a fixed-size queue and are run by ``num_workers`` daemon
+    threads, so request threads only pay for an enqueue. Submitting to a full
+    queue raises QueueFullError instead of piling up more work. Job state is
+    kept in memory; finished jobs are dropped after ``result_ttl`` seconds or
+    once more than ``max_finished_jobs`` have accumulated.
+
+    Jobs run in the process that accepted them. With ``state_path``, every
+    state change is also written to a ``jobs`` table in that SQLite file, so
+    any worker process sharing the file can report on any job.
+    """
+
+    def __init__(self,
+                 num_workers: int = 2,
+                 max_queue_size: int = 20,
+                 max_finished_jobs: int = 500,
+                 result_ttl: float = 3600,
+                 state_path: Optional[str] = None):
+        self.num_workers = max(1, num_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.max_finished_jobs = max_finished_jobs
+        self.result_ttl = result_ttl
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.max_queue_size)
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+        self._state = None
+        self._state_lock = threading.Lock()
+        if state_path:
+            directory = os.path.dirname(state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._state = sqlite3.connect(state_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._state.execute("PRAGMA journal_mode=WAL")
+            self._state.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+        self._workers = []
+        for idx in range(self.num_workers):
+            worker = threading.Thread(target=self._work, name=f"job-worker-{idx}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, target: Callable[[ProgressCallback], Any], kind: str = 'job') -> str:
+        """Queue ``target`` to run in the background and return its job id"""
+        job_id = str(uuid.uuid4())
+        job = {
+            'job_id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'progress': {},
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        with self._lock:
+            self._prune()
+            try:
+                self._queue.put_nowait((job_id, target))
+            except queue.Full:
+                self._counters['rejected'] += 1
+                raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+            self._jobs[job_id] = job
+            self._counters['submitted'] += 1
+            snapshot = self._snapshot(job)
+        self._persist(snapshot)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Snapshot of a job's state, or None if it is unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                snapshot = self._snapshot(job)
+                if job['status'] == 'queued':
+                    snapshot['queue_position'] = self._queue_position(job_id)
+                return snapshot
+        # Possibly accepted by another worker process
+        return self._load(job_id)
+
+    @staticmethod
+    def _snapshot(job: Dict) -> Dict:
+        snapshot = dict(job)
+        snapshot['progress'] = dict(job['progress'])
+        return snapshot
+
+    def _persist(self, snapshot: Dict):
+        if self._state is None:
+            return
+        try:
+            with self._state_lock:
+                self._state.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, data, updated_at) VALUES (?, ?, ?)",
+                    (snapshot['job_id'], json.dumps(snapshot, default=str), time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning('Could not store state of job %s: %s', snapshot['job_id'], str(e))
+
+    def _load(self, job_id: str) -> Optional[Dict]:
+        if self._state is None:
+            return None
+        with self._state_lock:
+            row = self._state.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row[0])
+        if job['finished_at'] is not None and job['finished_at'] + self.result_ttl < time.time():
+            return None
+        return job
+
+    def stats(self) -> Dict:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job['status'] == 'running')
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_queue_size': self.max_queue_size,
+                'workers': self.num_workers,
+                'running': running,
+                **self._counters,
+            }
+
+    def _queue_position(self, job_id: str) -> int:
+        position = 0
+        for other_id, job in self._jobs.items():
+            if job['status'] == 'queued':
+                position += 1
+                if other_id == job_id:
+                    return position
+        return 0
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            snapshot = self._snapshot(job)
+        self._persist(snapshot)
+
+    def _work(self):
+        while True:
+            job_id, target = self._queue.get()
+            self._update(job_id, status='running', started_at=time.time())
+
+            def report_progress(progress: Dict, job_id=job_id):
+                with self._lock:
+                    job = self._jobs.get(job_id)
+                    if job is None:
+                        return
+                    job['progress'].update(progress)
+                    snapshot = self._snapshot(job)
+                self._persist(snapshot)
+
+            try:
+                result = target(report_progress)
+                self._update(job_id, status='completed', result=result, finished_at=time.time())
+                outcome = 'completed'
+            except Exception as e:
+                logger.error('Job %s failed: %s', job_id, str(e))
+                logger.error('Traceback: %s', traceback.format_exc())
+                self._update(job_id, status='failed', error=str(e), finished_at=time.time())
+                outcome = 'failed'
+            finally:
+                self._queue.task_done()
+            with self._lock:
+                self._counters[outcome] += 1
+
+    def _prune(self):
+        """Drop expired and excess finished jobs; caller must hold the lock"""
+        now = time.time()
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job['status'] in ('completed', 'failed')
+        ]
+        excess = len(finished) - self.max_finished_jobs
+        for job_id in finished:
+            job = self._jobs[job_id]
+            if excess > 0 or job['finished_at'] + self.result_ttl < now:
+                del self._jobs[job_id]
+                excess -= 1
+        if self._state is not None:
+            # Rows of every process's jobs, including ones whose process died
+            try:
+                with self._state_lock:
+                    self._state.execute("DELETE FROM jobs WHERE updated_at < ?", (now - self.result_ttl,))
+            except sqlite3.Error as e:
+                logger.warning('Could not prune stored jobs: %s', str(e))
@@ -0,0 +1,241 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+# A callback returns (labels, value) samples each time metrics are rendered
+SampleCallback = Callable[[], Iterable[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = self.header()
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[bisect.bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {key: list(state) for key, state in self._values.items()}
+        lines = self.header()
+        inf_label = 'le="+Inf"'
+        for key, state in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += state[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf_label)} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class _CallbackMetric(_Metric):
+    """Metric whose samples are read from a callback at render time"""
+
+    def __init__(self, name: str, documentation: str, type_name: str, callback: SampleCallback):
+        super().__init__(name, documentation)
+        self.type_name = type_name
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, value in self.callback():
+            lines.append(f"{self.name}{_format_labels(labels.keys(), labels.values())} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus-style metrics registry.
+
+    Values live in the memory of the current worker process, so each gunicorn
+    worker reports its own series.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def register_callback(self, name: str, documentation: str, callback: SampleCallback,
+                          type_name: str = 'gauge'):
+        self._register(_CallbackMetric(name, documentation, type_name, callback))
+
+    def render(self) -> str:
+        """Text exposition format, as served on /metrics"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry and the metrics shared by the services
+metrics = MetricsRegistry()
+
+STAGE_LATENCY = metrics.histogram(
+    'startup_explorer_stage_duration_seconds',
+    'Time spent in each stage of the matching and outreach pipelines',
+    ('stage',)
+)
+LLM_REQUESTS = metrics.counter(
+    'startup_explorer_llm_requests_total',
+    'OpenAI API calls by operation and outcome',
+    ('operation', 'outcome')
+)
+LLM_TOKENS = metrics.counter(
+    'startup_explorer_llm_tokens_total',
+    'OpenAI tokens used by operation and kind (prompt or completion)',
+    ('operation', 'kind')
+)
+HTTP_LATENCY = metrics.histogram(
+    'startup_explorer_http_request_duration_seconds',
+    'HTTP request latency by endpoint',
+    ('method', 'endpoint', 'status')
+)
+
+
+def record_llm_usage(operation: str, response: Optional[object]):
+    """Count a successful OpenAI call and the tokens it reported"""
+    LLM_REQUESTS.inc(operation=operation, outcome='success')
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, 'prompt_tokens', None)
+    completion_tokens = getattr(usage, 'completion_tokens', None)
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, operation=operation, kind='prompt')
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, operation=operation, kind='completion')
+
+
+def timed_llm_call(operation: str, create: Callable, **kwargs):
+    """Call an OpenAI ``create`` method, recording its latency, outcome and token usage"""
+    with STAGE_LATENCY.time(stage=operation):
+        try:
+            response = create(**kwargs)
+        except Exception:
+            LLM_REQUESTS.inc(operation=operation, outcome='error')
+            raise
+    record_llm_usage(operation, response)
+    return response
+
+
+def cache_stats_callback(caches: Dict[str, Callable[[], Dict]]) -> SampleCallback:
+    """Turn cache ``stats()`` methods into lookup samples labelled by cache and outcome"""
+    def collect():
+        for cache_name, stats in caches.items():
+            values = stats()
+            for outcome in ('memory_hits', 'disk_hits', 'misses'):
+                yield {'cache': cache_name, 'outcome': outcome}, values.get(outcome, 0)
+    return collect
+
+
+def instrument_app(app):
+    """Record per-endpoint request latency for a Flask app"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = getattr(g, 'metrics_started', None)
+        if started is not None:
+            # Route patterns keep label cardinality bounded
+            endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                endpoint=endpoint,
+                status=response.status_code
+            )
+        return response
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional
+
+from .cache import TieredCache
+
+DEFAULT_OUTREACH_CACHE_PATH = os.getenv("OUTREACH_CACHE_PATH", "./data/cache/outreach.sqlite3")
+DEFAULT_OUTREACH_CACHE_TTL = float(os.getenv("OUTREACH_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_OUTREACH_CACHE_MAX_ENTRIES = int(os.getenv("OUTREACH_CACHE_MAX_ENTRIES", "20000"))
+
+
+def _normalize(value: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", (value or '')).strip()
+
+
+class OutreachCache:
+    """
+    Cache of company-level outreach artifacts.
+
+    Sample contacts only depend on the company and the target role, and the
+    company context used in prompts only on the company, so both are shared
+    by every user who picks the same startup. Entries live in an in-process
+    LRU in front of a SQLite file shared by all workers.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl: Optional[float] = DEFAULT_OUTREACH_CACHE_TTL,
+                 max_entries: Optional[int] = DEFAULT_OUTREACH_CACHE_MAX_ENTRIES):
+        path = DEFAULT_OUTREACH_CACHE_PATH if path is None else path
+        self.cache = TieredCache(
+            path,
+            table="outreach",
+            ttl=ttl,
+            max_entries=max_entries
+        )
+
+    @staticmethod
+    def company_key(company_name: str) -> str:
+        return hashlib.sha256(_normalize(company_name).lower().encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(kind: str, company_name: str, prompt_version: str, role: str = '') -> str:
+        role_hash = hashlib.sha256(_normalize(role).lower().encode('utf-8')).hexdigest()[:16] if role else ''
+        return f"{kind}:{prompt_version}:{OutreachCache.company_key(company_name)}:{role_hash}"
+
+    def get_contacts(self, company_name: str, role: str, prompt_version: str) -> Optional[List[Dict]]:
+        return self.cache.get(self.make_key('contacts', company_name, prompt_version, role))
+
+    def set_contacts(self, company_name: str, role: str, prompt_version: str, contacts: List[Dict]):
+        self.cache.set(self.make_key('contacts', company_name, prompt_version, role), contacts)
+
+    def company_context(self, company_info: Dict) -> Dict:
+        """
+        Normalized name, description and industry for a company.
+
+        The first context stored for a company is reused afterwards, so every
+        prompt about it sees the same description regardless of which match
+        (and which evaluation's wording) it came from.
+        """
+        key = self.make_key('company', company_info.get('company_name', ''), '1')
+        context = self.cache.get(key)
+        if context is None:
+            context = {
+                'company_name': _normalize(company_info.get('company_name')),
+                'company_description': _normalize(company_info.get('company_description')),
+                'industry': _normalize(company_info.get('industry')) or None,
+            }
+            if context['company_description']:
+                self.cache.set(key, context)
+        return context
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
@@ -1,16 +1,41 @@
 from openai import OpenAI
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
 import os
 from dotenv import load_dotenv
+from .outreach_cache import OutreachCache
+from .metrics import LLM_REQUESTS, STAGE_LATENCY, record_llm_usage, timed_llm_call
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Outreach packages generated at once by a bulk request; each package makes
+# two GPT-4 calls of its own
+DEFAULT_BULK_CONCURRENCY = int(os.getenv("OUTREACH_BULK_CONCURRENCY", "3"))
+# Part of every cached contacts key; bump it when the contacts prompt or model changes
+CONTACTS_PROMPT_VERSION = "1"
+
 class OutreachService:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self,
+                 client: Optional[OpenAI] = None,
+                 bulk_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+                 outreach_cache: Optional[OutreachCache] = None):
+        self.client = client or OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.bulk_concurrency = max(1, bulk_concurrency)
+        self.outreach_cache = outreach_cache or OutreachCache()
+
+    def _company_context(self, company_info: Dict) -> Dict:
+        """Company info with the shared, cached company context applied"""
+        return {**company_info, **self.outreach_cache.company_context(company_info)}
 
     def generate_sample_contacts(self, company_info: Dict, role_preference: str) -> List[Dict]:
         """Generate realistic but fictional sample contacts using GPT-4"""
+        company_name = company_info.get('company_name') or ''
+        cached = self.outreach_cache.get_contacts(company_name, role_preference, CONTACTS_PROMPT_VERSION)
+        if cached is not None:
+            return cached
         
         prompt = f"""
         Generate 2 realistic but fictional contacts for this company:
@@ -41,7 +66,9 @@ class OutreachService:
         """
 
         try:
-            response = self.client.chat.completions.create(
+            response = timed_llm_call(
+                'generate_contacts',
+                self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are an expert at generating realistic but fictional business contacts."},
@@ -52,10 +79,12 @@ class OutreachService:
             
             import json
             contacts = json.loads(response.choices[0].message.content)
+            # Fallback contacts below are deliberately not cached
+            self.outreach_cache.set_contacts(company_name, role_preference, CONTACTS_PROMPT_VERSION, contacts)
             return contacts
             
         except Exception as e:
-            print(f"Error generating contacts: {str(e)}")
+            logger.error("Error generating contacts: %s", e)
             # Return fallback contacts if generation fails
             return [
                 {
@@ -70,7 +99,7 @@ class OutreachService:
                 }
             ]
 
-    def _generate_cover_letter(self, resume_text: str, company_info: Dict, role: str) -> str:
+    def _cover_letter_messages(self, resume_text: str, company_info: Dict, role: str) -> List[Dict]:
         prompt = f"""
         Write a professional cover letter for a job application based on the following information.
         Do not include the date or company address. Start directly with "Dear Hiring Manager," 
@@ -95,18 +124,44 @@ class OutreachService:
 
         Keep the tone professional but conversational.
         """
+        return [
+            {"role": "system", "content": "You are an expert at writing compelling cover letters."},
+            {"role": "user", "content": prompt}
+        ]
 
-        response = self.client.chat.completions.create(
+    def _generate_cover_letter(self, resume_text: str, company_info: Dict, role: str) -> str:
+        response = timed_llm_call(
+            'cover_letter',
+            self.client.chat.completions.create,
             model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an expert at writing compelling cover letters."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=self._cover_letter_messages(resume_text, company_info, role),
             temperature=0.7
         )
         
         return response.choices[0].message.content
 
+    def _stream_cover_letter(self, resume_text: str, company_info: Dict, role: str) -> Iterator[str]:
+        """Yield the cover letter in pieces as GPT-4 generates it"""
+        with STAGE_LATENCY.time(stage='cover_letter_stream'):
+            try:
+                stream = self.client.chat.completions.create(
+                    model="gpt-4",
+                    messages=self._cover_letter_messages(resume_text, company_info, role),
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                last_chunk = None
+                for chunk in stream:
+                    last_chunk = chunk
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except Exception:
+                LLM_REQUESTS.inc(operation='cover_letter_stream', outcome='error')
+                raise
+        # With include_usage the final chunk carries the token counts
+        record_llm_usage('cover_letter_stream', last_chunk)
+
     def get_outreach_package(self, 
                            resume_text: str, 
                            company_info: Dict,
@@ -114,21 +169,100 @@ class OutreachService:
         """
         Generate complete outreach package including contacts and cover letter
         """
-        # Generate sample contacts
-        contacts = self.generate_sample_contacts(
-            company_info,
-            role_preference
-        )
-        
-        # Generate cover letter
-        cover_letter = self._generate_cover_letter(
-            resume_text,
-            company_info,
-            role_preference
-        )
+        context = self._company_context(company_info)
+        # The two GPT-4 calls are independent, so generate the contacts in the
+        # background while the cover letter is written
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="outreach") as executor:
+            contacts_future = executor.submit(
+                self.generate_sample_contacts,
+                context,
+                role_preference
+            )
+            
+            cover_letter = self._generate_cover_letter(
+                resume_text,
+                context,
+                role_preference
+            )
+            contacts = contacts_future.result()
         
         return {
             "contacts": contacts,
             "cover_letter": cover_letter,
             "company_info": company_info
-        } 
\ No newline at end of file
+        } 
+
+    def iter_outreach_package(self,
+                              resume_text: str,
+                              company_info: Dict,
+                              role_preference: str) -> Iterator[Dict]:
+        """
+        Generate an outreach package, yielding progress events as they happen.
+
+        Events are dicts with an ``event`` name and its ``data``: ``contacts``
+        as soon as the contacts are ready, ``cover_letter`` for each piece of
+        the cover letter as it is generated, and a final ``summary`` carrying
+        the same package get_outreach_package returns.
+        """
+        context = self._company_context(company_info)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outreach")
+        try:
+            contacts_future = executor.submit(
+                self.generate_sample_contacts,
+                context,
+                role_preference
+            )
+            contacts_sent = False
+            pieces = []
+            for piece in self._stream_cover_letter(resume_text, context, role_preference):
+                if not contacts_sent and contacts_future.done():
+                    contacts_sent = True
+                    yield {'event': 'contacts', 'data': contacts_future.result()}
+                pieces.append(piece)
+                yield {'event': 'cover_letter', 'data': {'delta': piece}}
+
+            contacts = contacts_future.result()
+            if not contacts_sent:
+                yield {'event': 'contacts', 'data': contacts}
+        finally:
+            # Don't block an abandoned stream on the contacts call
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        yield {'event': 'summary', 'data': {
+            "contacts": contacts,
+            "cover_letter": ''.join(pieces),
+            "company_info": company_info
+        }}
+
+    def iter_outreach_packages(self,
+                               resume_text: str,
+                               companies: List[Dict],
+                               role_preference: str) -> Iterator[Tuple[str, Dict]]:
+        """
+        Generate packages for several companies, at most ``bulk_concurrency`` at a time.
+
+        Yields ``(company name, package)`` pairs as each package is finished.
+        A company whose package fails yields ``{"error": ...}`` instead, so
+        one failure never holds up the others.
+        """
+        if not companies:
+            return
+
+        workers = min(self.bulk_concurrency, len(companies))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outreach-bulk")
+        try:
+            futures = {
+                executor.submit(self.get_outreach_package, resume_text, company_info, role_preference):
+                    company_info['company_name']
+                for company_info in companies
+            }
+            for future in as_completed(futures):
+                company_name = futures[future]
+                try:
+                    yield company_name, future.result()
+                except Exception as e:
+                    logger.warning("Outreach package for %s failed: %s", company_name, e)
+                    yield company_name, {"error": str(e)}
+        finally:
+            # Don't block an abandoned stream on packages still being written
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,156 @@
+import re
+from typing import Dict, List, Optional
+
+# Words too common in resumes and press releases to say anything about fit
+_STOPWORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'have', 'has', 'are', 'was', 'were',
+    'will', 'our', 'your', 'their', 'its', 'into', 'over', 'more', 'than', 'also', 'which',
+    'company', 'team', 'work', 'worked', 'working', 'years', 'year', 'experience', 'new',
+    'all', 'not', 'but', 'who', 'about', 'they', 'them', 'been', 'can', 'using', 'used',
+    'an', 'as', 'at', 'be', 'by', 'if', 'in', 'is', 'it', 'of', 'on', 'or', 'so', 'to',
+    'us', 'we', 'me', 'my', 'no', 'he',
+}
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+_AMOUNT_PATTERN = re.compile(r"\$?\s*(\d+(?:\.\d+)?)\s*(million|m|billion|b)\b", re.IGNORECASE)
+
+# Rough round size (in $M) that each stage label usually corresponds to
+_STAGE_RANGES = {
+    'pre-seed': (0, 2),
+    'seed': (0, 5),
+    'series a': (5, 25),
+    'series b': (25, 75),
+    'series c': (50, 200),
+    'growth': (75, float('inf')),
+    'late stage': (100, float('inf')),
+}
+
+
+def _tokens(text: str) -> set:
+    return {
+        token for token in _TOKEN_PATTERN.findall((text or '').lower())
+        # Two-letter tokens matter here: "ai", "ml", "go", "ui", "c#"
+        if len(token) > 1 and token not in _STOPWORDS
+    }
+
+
+class CandidatePreRanker:
+    """
+    Cheap local scoring of retrieved candidates.
+
+    Runs between the Chroma query and the GPT-4 evaluation so that only the
+    most promising candidates are sent to the LLM. Scores use the metadata the
+    indexer already stores with each document (mentioned_locations,
+    has_funding_info, extracted_amounts, section_present and, when present,
+    the company profile) plus keyword overlap with the candidate's preferences
+    and resume.
+    """
+
+    weights = {
+        'similarity': 0.35,
+        'industry': 0.2,
+        'skills': 0.2,
+        'location': 0.1,
+        'stage': 0.1,
+        'coverage': 0.05,
+    }
+
+    def _industry_score(self, industries: List[str], doc_tokens: set) -> float:
+        if not industries:
+            return 0.5
+        hits = 0
+        for industry in industries:
+            # "AI/ML" -> {"ai", "ml"}; "FinTech" -> {"fintech"}
+            terms = {t for t in re.split(r"[\s/,&-]+", industry.lower()) if t}
+            if terms & doc_tokens or industry.lower() in doc_tokens:
+                hits += 1
+        return hits / len(industries)
+
+    def _location_score(self, locations: List[str], metadata: Dict, document: str) -> float:
+        if not locations:
+            return 0.5
+        wanted = [loc.strip().lower() for loc in locations if loc.strip()]
+        if any(loc == 'remote' for loc in wanted):
+            return 1.0
+        mentioned = ' '.join([
+            metadata.get('mentioned_locations') or '',
+            metadata.get('profile_locations') or '',
+        ]).lower()
+        text = document.lower()
+        return 1.0 if any(loc in mentioned or loc in text for loc in wanted) else 0.0
+
+    def _stage_score(self, stages: List[str], metadata: Dict, document: str) -> float:
+        if not stages:
+            return 0.5
+        wanted = [stage.strip().lower() for stage in stages if stage.strip()]
+        text = f"{metadata.get('profile_stage') or ''} {document}".lower()
+        if any(stage in text for stage in wanted):
+            return 1.0
+        if not metadata.get('has_funding_info'):
+            return 0.3
+
+        amounts = []
+        for value, unit in _AMOUNT_PATTERN.findall(metadata.get('extracted_amounts') or ''):
+            amount = float(value)
+            amounts.append(amount * 1000 if unit.lower() in ('billion', 'b') else amount)
+        if not amounts:
+            return 0.3
+        raised = max(amounts)
+        for stage in wanted:
+            low, high = _STAGE_RANGES.get(stage, (None, None))
+            if low is not None and low <= raised <= high:
+                return 0.8
+        return 0.1
+
+    def _skills_score(self, resume_tokens: set, doc_tokens: set) -> float:
+        if not resume_tokens:
+            return 0.0
+        overlap = len(resume_tokens & doc_tokens)
+        # A handful of shared terms is already a strong signal for short releases
+        return min(1.0, overlap / min(len(resume_tokens), 25))
+
+    def _coverage_score(self, metadata: Dict) -> float:
+        present = set(filter(None, (metadata.get('section_present') or '').split(',')))
+        useful = {'company_description', 'product_details', 'technical_info', 'funding_info'}
+        return len(present & useful) / len(useful)
+
+    def score(self,
+              resume_tokens: set,
+              preferences: Dict,
+              document: str,
+              metadata: Optional[Dict],
+              distance: float) -> float:
+        metadata = metadata or {}
+        doc_tokens = _tokens(' '.join([
+            document,
+            metadata.get('company_description', ''),
+            metadata.get('profile_description', ''),
+            metadata.get('profile_industry', ''),
+            metadata.get('product_details', ''),
+            metadata.get('technical_info', ''),
+        ]))
+        features = {
+            'similarity': max(0.0, 1.0 - distance),
+            'industry': self._industry_score(preferences.get('industries', []), doc_tokens),
+            'skills': self._skills_score(resume_tokens, doc_tokens),
+            'location': self._location_score(preferences.get('work_locations', []), metadata, document),
+            'stage': self._stage_score(preferences.get('company_stages', []), metadata, document),
+            'coverage': self._coverage_score(metadata),
+        }
+        return sum(self.weights[name] * value for name, value in features.items())
+
+    def rank(self, resume_text: str, preferences: Dict, results: Dict, top_k: int) -> List[int]:
+        """Return the indices of the ``top_k`` best candidates in a Chroma query result"""
+        resume_tokens = _tokens(resume_text)
+        documents = results['documents'][0]
+        scores = [
+            self.score(
+                resume_tokens,
+                preferences,
+                document,
+                results['metadatas'][0][idx],
+                results['distances'][0][idx]
+            )
+            for idx, document in enumerate(documents)
+        ]
+        ranked = sorted(range(len(documents)), key=lambda idx: scores[idx], reverse=True)
+        return ranked[:top_k]
@@ -0,0 +1,194 @@
+from openai import OpenAI, DefaultHttpxClient
+import chromadb
+import httpx
+import logging
+import os
+import threading
+from dotenv import load_dotenv
+
+from .company_matcher import PASSAGE_COLLECTION_NAME, PASSAGES_ENABLED, CompanyMatcherService
+from .embedding_cache import EmbeddingCache
+from .evaluation_cache import EvaluationCache
+from .job_queue import JobQueue
+from .outreach_cache import OutreachCache
+from .outreach_service import OutreachService
+from .resume_extraction import ResumeExtractor
+from .resume_index import ResumeIndex
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "startup_press_releases"
+
+
+class ServiceRegistry:
+    """
+    Process-wide holder for the expensive clients used by the services.
+
+    Each gunicorn worker imports the app once, so every client below is built
+    at most once per worker and shared by all request threads. Building is
+    guarded by a lock so two threads racing on a cold registry still end up
+    with a single instance.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._openai_client = None
+        self._chroma_client = None
+        self._collection = None
+        self._passage_collection = None
+        self._passage_collection_loaded = False
+        self._embedding_cache = None
+        self._evaluation_cache = None
+        self._matcher = None
+        self._outreach = None
+        self._outreach_cache = None
+        self._job_queue = None
+        self._resume_extractor = None
+        self._resume_index = None
+
+    def openai_client(self) -> OpenAI:
+        """OpenAI client backed by a pooled keep-alive HTTP connection pool"""
+        if self._openai_client is None:
+            with self._lock:
+                if self._openai_client is None:
+                    http_client = DefaultHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+                            max_keepalive_connections=int(os.getenv("OPENAI_KEEPALIVE_CONNECTIONS", "10")),
+                            keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+                        )
+                    )
+                    self._openai_client = OpenAI(
+                        api_key=os.getenv("OPENAI_API_KEY"),
+                        http_client=http_client
+                    )
+        return self._openai_client
+
+    def chroma_client(self):
+        if self._chroma_client is None:
+            with self._lock:
+                if self._chroma_client is None:
+                    self._chroma_client = chromadb.PersistentClient(
+                        path=os.getenv("CHROMA_DB_PATH", "./data/chromadb")
+                    )
+        return self._chroma_client
+
+    def collection(self):
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    self._collection = self.chroma_client().get_collection(COLLECTION_NAME)
+        return self._collection
+
+    def passage_collection(self):
+        """Passage collection when MATCH_PASSAGES=1 and the indexer has built it, else None"""
+        if not self._passage_collection_loaded:
+            with self._lock:
+                if not self._passage_collection_loaded:
+                    if PASSAGES_ENABLED:
+                        try:
+                            self._passage_collection = self.chroma_client().get_collection(PASSAGE_COLLECTION_NAME)
+                        except Exception as e:
+                            logger.warning('Passage collection unavailable, matching whole documents: %s', str(e))
+                    self._passage_collection_loaded = True
+        return self._passage_collection
+
+    def embedding_cache(self) -> EmbeddingCache:
+        if self._embedding_cache is None:
+            with self._lock:
+                if self._embedding_cache is None:
+                    self._embedding_cache = EmbeddingCache()
+        return self._embedding_cache
+
+    def evaluation_cache(self) -> EvaluationCache:
+        if self._evaluation_cache is None:
+            with self._lock:
+                if self._evaluation_cache is None:
+                    self._evaluation_cache = EvaluationCache()
+        return self._evaluation_cache
+
+    def matcher(self) -> CompanyMatcherService:
+        if self._matcher is None:
+            with self._lock:
+                if self._matcher is None:
+                    self._matcher = CompanyMatcherService(
+                        client=self.openai_client(),
+                        collection=self.collection(),
+                        passage_collection=self.passage_collection(),
+                        embedding_cache=self.embedding_cache(),
+                        evaluation_cache=self.evaluation_cache()
+                    )
+        return self._matcher
+
+    def outreach_cache(self) -> OutreachCache:
+        if self._outreach_cache is None:
+            with self._lock:
+                if self._outreach_cache is None:
+                    self._outreach_cache = OutreachCache()
+        return self._outreach_cache
+
+    def outreach(self) -> OutreachService:
+        if self._outreach is None:
+            with self._lock:
+                if self._outreach is None:
+                    self._outreach = OutreachService(
+                        client=self.openai_client(),
+                        outreach_cache=self.outreach_cache()
+                    )
+        return self._outreach
+
+    def job_queue(self) -> JobQueue:
+        """Background worker pool for asynchronous match jobs"""
+        if self._job_queue is None:
+            with self._lock:
+                if self._job_queue is None:
+                    self._job_queue = JobQueue(
+                        num_workers=int(os.getenv("MATCH_JOB_WORKERS", "2")),
+                        max_queue_size=int(os.getenv("MATCH_JOB_QUEUE_SIZE", "20")),
+                        result_ttl=float(os.getenv("MATCH_JOB_RESULT_TTL", "3600")),
+                        # Job status must be readable from every worker, like sessions
+                        state_path=(
+                            os.getenv("SESSION_DB_PATH", "./data/cache/sessions.sqlite3")
+                            if os.getenv("SESSION_BACKEND", "memory") == "sqlite" else None
+                        )
+                    )
+        return self._job_queue
+
+    def resume_extractor(self) -> ResumeExtractor:
+        """Resume text extraction; its process pool starts on first use"""
+        if self._resume_extractor is None:
+            with self._lock:
+                if self._resume_extractor is None:
+                    self._resume_extractor = ResumeExtractor()
+        return self._resume_extractor
+
+    def resume_index(self) -> ResumeIndex:
+        if self._resume_index is None:
+            with self._lock:
+                if self._resume_index is None:
+                    self._resume_index = ResumeIndex()
+        return self._resume_index
+
+    def warm(self):
+        """
+        Open the Chroma collections and load their vector indexes into memory.
+
+        Chroma loads the HNSW segment lazily on the first query, so we run one
+        nearest-neighbour lookup with a stored embedding to pay that cost at
+        boot instead of on the first user request.
+        """
+        collections = [(COLLECTION_NAME, self.collection())]
+        if self.passage_collection() is not None:
+            collections.append((PASSAGE_COLLECTION_NAME, self.passage_collection()))
+        for name, collection in collections:
+            sample = collection.peek(limit=1)
+            embeddings = sample.get('embeddings')
+            if embeddings is not None and len(embeddings) > 0:
+                collection.query(query_embeddings=[list(embeddings[0])], n_results=1)
+            logger.info('Warmed collection %s (%d documents)', name, collection.count())
+
+
+# Default registry shared by the whole worker process
+registry = ServiceRegistry()
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import random
+import time
+from typing import Optional
+
+from flask import Flask, g, request
+
+access_logger = logging.getLogger("access")
+body_logger = logging.getLogger("access.body")
+
+# Only these request/response types are worth previewing as text
+_TEXT_MIMETYPES = ('application/json', 'application/x-www-form-urlencoded', 'text/')
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``fields`` passed via ``extra``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class Preview:
+    """
+    Size-capped, lazily formatted view of a payload for log arguments.
+
+    Nothing is decoded or truncated unless a handler actually renders the
+    record, so disabled log calls cost next to nothing.
+    """
+
+    def __init__(self, data, max_bytes: Optional[int] = None):
+        self.data = data
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("LOG_BODY_MAX_BYTES", "2048"))
+
+    def __str__(self) -> str:
+        data = self.data
+        if isinstance(data, (bytes, bytearray)):
+            text = bytes(data[:self.max_bytes]).decode('utf-8', errors='replace')
+            size = len(data)
+        else:
+            text = data if isinstance(data, str) else repr(data)
+            size = len(text)
+            text = text[:self.max_bytes]
+        if size > self.max_bytes:
+            return f"{text}... [{size - self.max_bytes} more bytes]"
+        return text
+
+
+def configure_logging():
+    """
+    Set up root logging from the environment.
+
+    LOG_LEVEL picks the level (default INFO) and LOG_FORMAT=json switches to
+    one JSON object per line.
+    """
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    handler = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "text") == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+
+
+class RequestLogger:
+    """
+    Access logging for a Flask app.
+
+    Writes one structured line per request to the ``access`` logger. Request
+    and response bodies are only logged for a sampled fraction of requests
+    (LOG_BODY_SAMPLE_RATE) and only when ``access.body`` is enabled at DEBUG,
+    as capped previews.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.access_enabled = os.getenv("LOG_ACCESS", "1") != "0"
+        self.body_sample_rate = float(os.getenv("LOG_BODY_SAMPLE_RATE", "0"))
+        self.json_format = os.getenv("LOG_FORMAT", "text") == "json"
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        g.request_started = time.perf_counter()
+        g.log_body = (
+            self.body_sample_rate > 0
+            and body_logger.isEnabledFor(logging.DEBUG)
+            and random.random() < self.body_sample_rate
+        )
+        if g.log_body:
+            body_logger.debug('Request %s %s args=%s body=%s',
+                              request.method, request.path, dict(request.args), self._request_body())
+
+    def _request_body(self):
+        mimetype = request.mimetype or ''
+        if not mimetype.startswith(_TEXT_MIMETYPES):
+            return f"<{mimetype or 'unknown'} {request.content_length or 0} bytes>"
+        return Preview(request.get_data(cache=True))
+
+    def _after_request(self, response):
+        if getattr(g, 'log_body', False):
+            # Reading the body of a streamed response would drain the stream
+            if response.is_streamed or response.direct_passthrough:
+                body = '<streamed>'
+            else:
+                body = Preview(response.get_data())
+            body_logger.debug('Response %s %s status=%s body=%s',
+                              request.method, request.path, response.status_code, body)
+
+        if self.access_enabled and access_logger.isEnabledFor(logging.INFO):
+            started = getattr(g, 'request_started', None)
+            fields = {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1) if started else None,
+                # Header only; computing the length would drain a streamed body
+                'bytes': response.content_length,
+                'remote_addr': request.headers.get('X-Forwarded-For', request.remote_addr),
+            }
+            if self.json_format:
+                access_logger.info('request', extra={'fields': fields})
+            else:
+                access_logger.info(' '.join(f"{key}={value}" for key, value in fields.items()))
+        return response
@@ -0,0 +1,247 @@
+import io
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional
+from xml.etree import ElementTree
+
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+DEFAULT_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "50"))
+DEFAULT_TIMEOUT = float(os.getenv("RESUME_EXTRACTION_TIMEOUT", "20"))
+DEFAULT_WORKERS = int(os.getenv("RESUME_EXTRACTION_WORKERS", "2"))
+# Cap on the uncompressed document XML of a .docx, so a zip bomb can't pass the upload size check
+DEFAULT_MAX_DOCX_XML_BYTES = int(os.getenv("RESUME_MAX_DOCX_XML_BYTES", str(20 * 1024 * 1024)))
+# Pages handed to one pool task; small resumes are extracted in a single task
+PAGES_PER_TASK = 4
+
+_WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(Exception):
+    """Raised when a resume cannot be turned into text within its budget"""
+
+
+def _extract_pdf_pages(data: bytes, start: int, end: int) -> List[str]:
+    """Extract pages ``start:end`` of a PDF; runs in a pool process"""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [reader.pages[idx].extract_text() or '' for idx in range(start, end)]
+
+
+def _extract_docx(data: bytes, max_xml_bytes: int = DEFAULT_MAX_DOCX_XML_BYTES) -> str:
+    """Paragraph text of a .docx file, read straight from its XML"""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            info = archive.getinfo('word/document.xml')
+            # zipfile never inflates past the declared size, so checking it bounds the read
+            if info.file_size > max_xml_bytes:
+                raise ExtractionError(
+                    f"DOCX content is larger than {max_xml_bytes // (1024 * 1024)} MB uncompressed"
+                )
+            root = ElementTree.fromstring(archive.read(info))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise ExtractionError(f"Not a valid DOCX file: {str(e)}")
+    paragraphs = []
+    for paragraph in root.iter(f'{_WORD_NAMESPACE}p'):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f'{_WORD_NAMESPACE}t' and node.text:
+                parts.append(node.text)
+            elif node.tag == f'{_WORD_NAMESPACE}tab':
+                parts.append('\t')
+        paragraphs.append(''.join(parts))
+    return '\n'.join(paragraphs)
+
+
+def _extract_doc(data: bytes, timeout: float) -> str:
+    """Text of a legacy .doc file via the ``antiword`` command-line tool"""
+    antiword = shutil.which('antiword')
+    if antiword is None:
+        raise ExtractionError("DOC files are not supported on this server; please upload a PDF or DOCX")
+    # antiword only reads from a path, so this format needs a short-lived temp file
+    with tempfile.NamedTemporaryFile(suffix='.doc') as tmp:
+        tmp.write(data)
+        tmp.flush()
+        try:
+            completed = subprocess.run(
+                [antiword, tmp.name], capture_output=True, timeout=timeout, check=True
+            )
+        except subprocess.TimeoutExpired:
+            raise ExtractionError(f"DOC extraction exceeded {timeout:.0f}s")
+        except subprocess.CalledProcessError as e:
+            raise ExtractionError(f"Error processing DOC: {e.stderr.decode('utf-8', errors='replace').strip()}")
+    return completed.stdout.decode('utf-8', errors='replace')
+
+
+class ResumeExtractor:
+    """
+    Turns uploaded resume bytes into text without writing them to disk.
+
+    PDF pages are extracted in a process pool, so a long resume neither holds
+    the GIL nor ties up the request thread's CPU time, and each document is
+    bounded by ``max_bytes``, ``max_pages`` and an overall ``timeout``. A
+    timeout terminates the pool, since a page stuck in PyPDF2 would otherwise
+    hold its process forever, and the next PDF starts a fresh one. With
+    ``max_workers=0`` extraction runs inline in the calling thread.
+    """
+
+    def __init__(self,
+                 max_workers: int = DEFAULT_WORKERS,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_pages: int = DEFAULT_MAX_PAGES,
+                 max_docx_xml_bytes: int = DEFAULT_MAX_DOCX_XML_BYTES):
+        self.max_workers = max(0, max_workers)
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.max_docx_xml_bytes = max_docx_xml_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # The app already runs threads (job queue, HTTP pools) by the
+                    # time the pool starts, and forking a threaded process can
+                    # deadlock the child
+                    methods = multiprocessing.get_all_start_methods()
+                    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def _terminate_pool(self, executor: ProcessPoolExecutor):
+        """Kill ``executor``'s processes, stuck or not, so the next PDF gets a fresh pool"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # ProcessPoolExecutor can't stop a running task; terminating its processes can.
+        # Other extractions still running in this pool fail and report an error.
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def extract(self, data: bytes, filename: str) -> str:
+        if len(data) > self.max_bytes:
+            raise ExtractionError(f"File is larger than {self.max_bytes // (1024 * 1024)} MB")
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if extension == 'pdf':
+            return self._extract_pdf(data)
+        if extension == 'docx':
+            return _extract_docx(data, self.max_docx_xml_bytes)
+        if extension == 'doc':
+            return _extract_doc(data, self.timeout)
+        raise ExtractionError(f"Unsupported file type: {extension or 'unknown'}")
+
+    def _extract_pdf(self, data: bytes) -> str:
+        deadline = time.monotonic() + self.timeout
+        try:
+            num_pages = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+        except Exception as e:
+            raise ExtractionError(f"Error processing PDF: {str(e)}")
+        if num_pages > self.max_pages:
+            raise ExtractionError(f"PDF has {num_pages} pages; the limit is {self.max_pages}")
+
+        if self.max_workers == 0:
+            try:
+                return '\n'.join(_extract_pdf_pages(data, 0, num_pages))
+            except Exception as e:
+                raise ExtractionError(f"Error processing PDF: {str(e)}")
+
+        ranges = [
+            (start, min(start + PAGES_PER_TASK, num_pages))
+            for start in range(0, num_pages, PAGES_PER_TASK)
+        ]
+        pool = self._pool()
+        futures = [pool.submit(_extract_pdf_pages, data, start, end) for start, end in ranges]
+        pages: List[str] = []
+        try:
+            for future in futures:
+                pages.extend(future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            logger.warning('PDF extraction exceeded %.0fs; restarting the extraction pool', self.timeout)
+            self._terminate_pool(pool)
+            raise ExtractionError(f"PDF extraction exceeded {self.timeout:.0f}s")
+        except Exception as e:
+            raise ExtractionError(f"Error processing PDF: {str(e)}")
+        return '\n'.join(pages)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class UploadRetention:
+    """
+    Optional on-disk copies of uploaded resumes.
+
+    Nothing is written unless ``enabled``. Saved files are pruned once they
+    are older than ``max_age`` seconds or more than ``max_files`` exist,
+    oldest first.
+    """
+
+    PRUNE_EVERY = 20
+
+    def __init__(self,
+                 folder: str,
+                 enabled: bool = False,
+                 max_age: float = 7 * 24 * 3600,
+                 max_files: int = 1000):
+        self.folder = folder
+        self.enabled = enabled
+        self.max_age = max_age
+        self.max_files = max_files
+        self._saves = 0
+        self._lock = threading.Lock()
+        if enabled:
+            os.makedirs(folder, exist_ok=True)
+
+    def save(self, data: bytes, filename: str) -> Optional[str]:
+        """Write ``data`` under ``filename`` if retention is enabled and return the path"""
+        if not self.enabled:
+            return None
+        path = os.path.join(self.folder, filename)
+        with open(path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            self._saves += 1
+            should_prune = self._saves % self.PRUNE_EVERY == 1
+        if should_prune:
+            self.prune()
+        return path
+
+    def prune(self):
+        try:
+            entries = [entry for entry in os.scandir(self.folder) if entry.is_file()]
+        except FileNotFoundError:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        cutoff = time.time() - self.max_age
+        for idx, entry in enumerate(entries):
+            if idx >= self.max_files or entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                except OSError as e:
+                    logger.warning('Could not remove old upload %s: %s', entry.path, str(e))
+
+
+def create_upload_retention(folder: str) -> UploadRetention:
+    """Build the upload retention policy from the RESUME_* environment variables"""
+    return UploadRetention(
+        folder=folder,
+        enabled=os.getenv("RESUME_STORE_UPLOADS", "0") == "1",
+        max_age=float(os.getenv("RESUME_RETENTION_SECONDS", str(7 * 24 * 3600))),
+        max_files=int(os.getenv("RESUME_RETENTION_MAX_FILES", "1000"))
+    )
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import time
+from typing import Dict, Optional
+
+from .cache import TieredCache
+from .evaluation_cache import EvaluationCache
+
+DEFAULT_RESUME_INDEX_PATH = os.getenv("RESUME_INDEX_PATH", "./data/cache/resumes.sqlite3")
+# Extracted text is resume content, so it follows the upload retention policy:
+# it only reaches disk when uploads are kept, and for no longer than they are
+RESUME_INDEX_ON_DISK = os.getenv("RESUME_STORE_UPLOADS", "0") == "1"
+DEFAULT_RESUME_INDEX_TTL = float(
+    os.getenv("RESUME_INDEX_TTL", os.getenv("RESUME_RETENTION_SECONDS", str(7 * 24 * 3600)))
+)
+DEFAULT_RESUME_INDEX_MAX_ENTRIES = int(
+    os.getenv("RESUME_INDEX_MAX_ENTRIES", os.getenv("RESUME_RETENTION_MAX_FILES", "1000"))
+)
+
+
+class ResumeIndex:
+    """
+    Content-hash index of uploaded resumes.
+
+    Maps the SHA-256 of an uploaded file's bytes to the text extracted from
+    it, so a repeat upload of the same file costs a hash and a lookup instead
+    of another parse. Each entry also records ``text_hash``, the resume hash
+    the evaluation cache is keyed by. Sessions carry it to the matcher, so
+    matching doesn't hash the resume text again on every request.
+
+    The index holds the full text of every resume, so unless uploads are
+    retained (RESUME_STORE_UPLOADS=1) it is kept in process memory only.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl: Optional[float] = DEFAULT_RESUME_INDEX_TTL,
+                 max_entries: Optional[int] = DEFAULT_RESUME_INDEX_MAX_ENTRIES):
+        if path is None:
+            path = DEFAULT_RESUME_INDEX_PATH if RESUME_INDEX_ON_DISK else ''
+        self.cache = TieredCache(
+            path,
+            table="resumes",
+            ttl=ttl,
+            max_entries=max_entries
+        )
+
+    @staticmethod
+    def hash_content(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        return self.cache.get(content_hash)
+
+    def add(self, content_hash: str, resume_text: str, filename: str, size: int) -> Dict:
+        entry = {
+            'resume_text': resume_text,
+            'text_hash': EvaluationCache.hash_text(resume_text),
+            'filename': filename,
+            'size': size,
+            'indexed_at': time.time(),
+        }
+        self.cache.set(content_hash, entry)
+        return entry
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
@@ -0,0 +1,280 @@
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# An update function mutates the session in place or returns a replacement
+SessionUpdate = Callable[[Dict], Optional[Dict]]
+
+
+def _session_size(data: Dict) -> int:
+    return len(json.dumps(data, separators=(',', ':')))
+
+
+class SessionStore(ABC):
+    """
+    Storage for user sessions.
+
+    Sessions expire ``ttl`` seconds after they were last used. ``get`` returns
+    a copy, so changes must go through ``update``, which applies a
+    read-modify-write atomically with respect to other threads and, for the
+    SQLite backend, other worker processes.
+    """
+
+    @abstractmethod
+    def create(self, data: Dict) -> str:
+        ...
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def update(self, session_id: str, fn: SessionUpdate) -> Optional[Dict]:
+        """Apply ``fn`` to the session and return the new state, or None if it doesn't exist"""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    def set_fields(self, session_id: str, **fields) -> Optional[Dict]:
+        return self.update(session_id, lambda data: data.update(fields))
+
+    def __contains__(self, session_id: str) -> bool:
+        return bool(session_id) and self.get(session_id) is not None
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store.
+
+    Least recently used sessions are evicted once there are more than
+    ``max_sessions`` of them or their serialized size exceeds ``max_bytes``.
+    Only suitable for a single worker process.
+    """
+
+    def __init__(self,
+                 ttl: float = 24 * 3600,
+                 max_sessions: int = 10000,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        # session_id -> (data, size, last_used)
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _live_entry(self, session_id: str):
+        """Fetch an unexpired entry and mark it recently used; caller holds the lock"""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        data, size, last_used = entry
+        if last_used + self.ttl < time.time():
+            self._remove(session_id)
+            return None
+        entry = (data, size, time.time())
+        self._sessions[session_id] = entry
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _store(self, session_id: str, data: Dict):
+        old = self._sessions.get(session_id)
+        if old is not None:
+            self._total_bytes -= old[1]
+        size = _session_size(data)
+        self._sessions[session_id] = (data, size, time.time())
+        self._sessions.move_to_end(session_id)
+        self._total_bytes += size
+        self._evict()
+
+    def _remove(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+
+    def _evict(self):
+        # Sessions are kept in order of last use, so the expired ones are at the front
+        expired_before = time.time() - self.ttl
+        while self._sessions:
+            session_id, (_, _, last_used) = next(iter(self._sessions.items()))
+            if last_used >= expired_before:
+                break
+            self._remove(session_id)
+        # Keep the most recently used session even if it alone exceeds the cap
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._total_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._sessions)))
+
+    def create(self, data: Dict) -> str:
+        session_id = str(uuid.uuid4())
+        with self._lock:
+            self._store(session_id, copy.deepcopy(data))
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._live_entry(session_id)
+            return copy.deepcopy(entry[0]) if entry else None
+
+    def update(self, session_id: str, fn: SessionUpdate) -> Optional[Dict]:
+        with self._lock:
+            entry = self._live_entry(session_id)
+            if entry is None:
+                return None
+            data = copy.deepcopy(entry[0])
+            result = fn(data)
+            if result is not None:
+                data = result
+            self._store(session_id, data)
+            return copy.deepcopy(data)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._remove(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store in a local SQLite file, shared by every worker process.
+
+    Runs in WAL mode; updates take a write lock for the whole
+    read-modify-write. Least recently used sessions are evicted once the
+    stored sessions exceed ``max_bytes``.
+    """
+
+    PRUNE_EVERY = 50
+
+    def __init__(self,
+                 path: str,
+                 ttl: float = 24 * 3600,
+                 max_bytes: int = 1024 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly below
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _after_write(self):
+        with self._writes_lock:
+            self._writes += 1
+            should_prune = self._writes % self.PRUNE_EVERY == 0
+        if should_prune:
+            self.prune()
+
+    def create(self, data: Dict) -> str:
+        session_id = str(uuid.uuid4())
+        payload = json.dumps(data)
+        self._connection().execute(
+            "INSERT INTO sessions (session_id, data, size, last_used) VALUES (?, ?, ?, ?)",
+            (session_id, payload, len(payload), time.time())
+        )
+        self._after_write()
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT data, last_used FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None or row[1] + self.ttl < time.time():
+            return None
+        conn.execute("UPDATE sessions SET last_used = ? WHERE session_id = ?", (time.time(), session_id))
+        return json.loads(row[0])
+
+    def update(self, session_id: str, fn: SessionUpdate) -> Optional[Dict]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data, last_used FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None or row[1] + self.ttl < time.time():
+                conn.execute("ROLLBACK")
+                return None
+            data = json.loads(row[0])
+            result = fn(data)
+            if result is not None:
+                data = result
+            payload = json.dumps(data)
+            conn.execute(
+                "UPDATE sessions SET data = ?, size = ?, last_used = ? WHERE session_id = ?",
+                (payload, len(payload), time.time(), session_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._after_write()
+        return data
+
+    def delete(self, session_id: str):
+        self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def prune(self):
+        """Drop expired sessions, then least recently used ones while over ``max_bytes``"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM sessions WHERE last_used < ?", (time.time() - self.ttl,))
+            conn.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM ("
+                "SELECT session_id, SUM(size) OVER (ORDER BY last_used DESC) AS running_size "
+                "FROM sessions) WHERE running_size > ?)",
+                (self.max_bytes,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store selected by the SESSION_BACKEND environment variable"""
+    backend = os.getenv("SESSION_BACKEND", "memory")
+    ttl = float(os.getenv("SESSION_TTL", str(24 * 3600)))
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            path=os.getenv("SESSION_DB_PATH", "./data/cache/sessions.sqlite3"),
+            ttl=ttl,
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(1024 * 1024 * 1024)))
+        )
+    if backend == "memory":
+        return InMemorySessionStore(
+            ttl=ttl,
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "10000")),
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+        )
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from services.job_queue import JobQueue, QueueFullError
+
+
+def wait_for(queue: JobQueue, job_id: str, status: str, progress: dict = None, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job is not None and job['status'] == status and (progress is None or job['progress'] == progress):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} never reached {status}: {queue.get(job_id)}")
+
+
+class JobQueueTest(unittest.TestCase):
+    def test_runs_job_and_reports_progress_and_result(self):
+        queue = JobQueue(num_workers=1)
+
+        def target(report_progress):
+            report_progress({'stage': 'done'})
+            return {'matches': [1, 2]}
+
+        job_id = queue.submit(target, kind='matches')
+        job = wait_for(queue, job_id, 'completed')
+        self.assertEqual(job['result'], {'matches': [1, 2]})
+        self.assertEqual(job['progress'], {'stage': 'done'})
+
+    def test_failed_job_records_error(self):
+        queue = JobQueue(num_workers=1)
+
+        def target(report_progress):
+            raise ValueError('boom')
+
+        job = wait_for(queue, queue.submit(target), 'failed')
+        self.assertEqual(job['error'], 'boom')
+
+    def test_full_queue_rejects_jobs(self):
+        queue = JobQueue(num_workers=1, max_queue_size=1)
+        release = threading.Event()
+        queue.submit(lambda report_progress: release.wait(5))
+        time.sleep(0.1)  # let the worker take the first job
+        queue.submit(lambda report_progress: None)
+        with self.assertRaises(QueueFullError):
+            queue.submit(lambda report_progress: None)
+        release.set()
+
+
+class SharedJobStateTest(unittest.TestCase):
+    """Job status must be readable from a worker process other than the one running the job"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'sessions.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_other_queue_sees_progress_and_result(self):
+        accepting = JobQueue(num_workers=1, state_path=self.path)
+        polling = JobQueue(num_workers=1, state_path=self.path)
+        proceed = threading.Event()
+
+        def target(report_progress):
+            report_progress({'stage': 'evaluating'})
+            proceed.wait(5)
+            return {'matches': ['a']}
+
+        job_id = accepting.submit(target, kind='matches')
+        job = wait_for(polling, job_id, 'running', progress={'stage': 'evaluating'})
+        self.assertEqual(job['kind'], 'matches')
+        proceed.set()
+        job = wait_for(polling, job_id, 'completed')
+        self.assertEqual(job['result'], {'matches': ['a']})
+
+    def test_expired_results_are_not_served(self):
+        accepting = JobQueue(num_workers=1, state_path=self.path, result_ttl=0.1)
+        polling = JobQueue(num_workers=1, state_path=self.path, result_ttl=0.1)
+        job_id = accepting.submit(lambda report_progress: 'done')
+        wait_for(polling, job_id, 'completed')
+        time.sleep(0.2)
+        self.assertIsNone(polling.get(job_id))
+
+    def test_without_state_path_jobs_are_process_local(self):
+        accepting = JobQueue(num_workers=1)
+        polling = JobQueue(num_workers=1)
+        job_id = accepting.submit(lambda report_progress: 'done')
+        wait_for(accepting, job_id, 'completed')
+        self.assertIsNone(polling.get(job_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import requests
 import os
+import json
 from pathlib import Path
 
 class MatchingFlowTester:
@@ -103,6 +104,35 @@ class MatchingFlowTester:
             print(f"✗ Getting matches failed: {response.json()}")
             return False
 
+    def test_stream_matches(self):
+        print("\n3b. Testing Streaming Matches...")
+        if not self.session_id:
+            print("✗ No session ID available")
+            return False
+
+        response = requests.get(
+            f"{self.base_url}/api/matches/stream",
+            params={"session_id": self.session_id, "format": "ndjson"},
+            stream=True
+        )
+        if response.status_code != 200:
+            print(f"✗ Streaming matches failed: {response.status_code}")
+            return False
+
+        events = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            events.append(event['event'])
+            print(f"✓ Received '{event['event']}' event")
+
+        if events and events[0] == 'retrieval' and events[-1] == 'summary':
+            print(f"✓ Stream completed with {events.count('match')} match events")
+            return True
+        print(f"✗ Unexpected event sequence: {events}")
+        return False
+
     def test_get_outreach_package(self):
         print("\n4. Testing Outreach Package Generation...")
         if not self.session_id or not self.selected_company_name:
@@ -168,6 +198,7 @@ def main():
         print("Stopping tests due to matching failure")
         return
         
+    tester.test_stream_matches()
     tester.test_get_outreach_package()
     tester.test_error_cases()
 
@@ -0,0 +1,80 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from services.prerank import CandidatePreRanker, _tokens
+
+
+def query_result(documents, metadatas=None, distances=None):
+    """A single-query Chroma result over ``documents``"""
+    return {
+        'ids': [[f"doc{idx}" for idx in range(len(documents))]],
+        'documents': [documents],
+        'metadatas': [metadatas or [{} for _ in documents]],
+        'distances': [distances or [0.2 for _ in documents]],
+    }
+
+
+class TokensTest(unittest.TestCase):
+    def test_keeps_short_technical_tokens(self):
+        tokens = _tokens('We build AI and ML tools in Go and C# with a great UI')
+        self.assertTrue({'ai', 'ml', 'go', 'c#', 'ui'} <= tokens)
+        self.assertFalse({'we', 'in', 'a', 'and'} & tokens)
+
+
+class IndustryScoreTest(unittest.TestCase):
+    def test_acronym_industries_match(self):
+        ranker = CandidatePreRanker()
+        doc_tokens = _tokens('We build AI and ML tools for fintech')
+        self.assertEqual(ranker._industry_score(['AI/ML'], doc_tokens), 1.0)
+        self.assertEqual(ranker._industry_score(['FinTech'], doc_tokens), 1.0)
+        self.assertEqual(ranker._industry_score(['Healthcare'], doc_tokens), 0.0)
+
+
+class RankTest(unittest.TestCase):
+    preferences = {
+        'industries': ['AI/ML'],
+        'work_locations': ['San Francisco'],
+        'company_stages': ['Seed'],
+    }
+    resume = 'Machine learning engineer: Python, PyTorch, ML infrastructure, Go services'
+
+    def test_prefers_candidates_matching_industry_skills_location_and_stage(self):
+        results = query_result(
+            documents=[
+                'A bakery chain in Berlin opened two new stores.',
+                'An AI startup in San Francisco building ML infrastructure in Python and Go raised a seed round.',
+                'A logistics company in Austin raised a Series C.',
+            ],
+            metadatas=[
+                {'mentioned_locations': 'Berlin'},
+                {'mentioned_locations': 'San Francisco', 'has_funding_info': True,
+                 'section_present': 'company_description,technical_info,funding_info'},
+                {'mentioned_locations': 'Austin', 'has_funding_info': True},
+            ],
+            distances=[0.3, 0.3, 0.3],
+        )
+        ranked = CandidatePreRanker().rank(self.resume, self.preferences, results, top_k=2)
+        self.assertEqual(ranked[0], 1)
+        self.assertEqual(len(ranked), 2)
+
+    def test_acronym_industry_is_not_pruned(self):
+        # Equal retrieval distance; only the AI/ML company should make the cut
+        results = query_result(
+            documents=[
+                'Acme sells enterprise accounting software to retailers.',
+                'Beta builds AI and ML tools for retailers.',
+            ],
+        )
+        ranked = CandidatePreRanker().rank('Python developer', {'industries': ['AI/ML']}, results, top_k=1)
+        self.assertEqual(ranked, [1])
+
+    def test_similarity_breaks_ties(self):
+        results = query_result(documents=['Same text.', 'Same text.'], distances=[0.5, 0.1])
+        ranked = CandidatePreRanker().rank('', {}, results, top_k=2)
+        self.assertEqual(ranked, [1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from services.session_store import InMemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+class SessionStoreContract:
+    """Behaviour both session backends must share; subclasses provide make_store"""
+
+    def make_store(self, **kwargs):
+        raise NotImplementedError
+
+    def test_create_and_get_returns_a_copy(self):
+        store = self.make_store()
+        session_id = store.create({'resume_text': 'python', 'matches': []})
+        data = store.get(session_id)
+        self.assertEqual(data, {'resume_text': 'python', 'matches': []})
+        data['matches'].append('x')
+        self.assertEqual(store.get(session_id)['matches'], [])
+
+    def test_unknown_session(self):
+        store = self.make_store()
+        self.assertIsNone(store.get('missing'))
+        self.assertIsNone(store.update('missing', lambda data: data.update(a=1)))
+        self.assertNotIn('missing', store)
+
+    def test_update_applies_in_place_and_replacement_functions(self):
+        store = self.make_store()
+        session_id = store.create({'count': 0})
+        self.assertEqual(store.update(session_id, lambda data: data.update(count=1)), {'count': 1})
+        self.assertEqual(store.update(session_id, lambda data: {'count': data['count'] + 1}), {'count': 2})
+        self.assertEqual(store.set_fields(session_id, other='x'), {'count': 2, 'other': 'x'})
+        self.assertEqual(store.get(session_id), {'count': 2, 'other': 'x'})
+
+    def test_sessions_expire_after_ttl(self):
+        store = self.make_store(ttl=0.2)
+        session_id = store.create({'a': 1})
+        self.assertIn(session_id, store)
+        time.sleep(0.3)
+        self.assertIsNone(store.get(session_id))
+        self.assertIsNone(store.update(session_id, lambda data: data.update(a=2)))
+
+    def test_use_extends_ttl(self):
+        store = self.make_store(ttl=0.4)
+        session_id = store.create({'a': 1})
+        for _ in range(3):
+            time.sleep(0.2)
+            self.assertIsNotNone(store.get(session_id))
+
+    def test_delete(self):
+        store = self.make_store()
+        session_id = store.create({'a': 1})
+        store.delete(session_id)
+        self.assertIsNone(store.get(session_id))
+
+    def test_concurrent_updates_are_atomic(self):
+        store = self.make_store()
+        session_id = store.create({'count': 0})
+
+        def increment():
+            for _ in range(50):
+                store.update(session_id, lambda data: data.update(count=data['count'] + 1))
+
+        threads = [threading.Thread(target=increment) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(store.get(session_id)['count'], 400)
+
+
+class SessionStoreInterfaceTest(unittest.TestCase):
+    def test_incomplete_backend_cannot_be_instantiated(self):
+        class Incomplete(SessionStore):
+            def create(self, data):
+                return 'id'
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class InMemorySessionStoreTest(SessionStoreContract, unittest.TestCase):
+    def make_store(self, **kwargs):
+        return InMemorySessionStore(**kwargs)
+
+    def test_writes_drop_expired_sessions(self):
+        store = InMemorySessionStore(ttl=0.2)
+        stale = [store.create({'n': n}) for n in range(3)]
+        time.sleep(0.1)
+        fresh = store.create({'n': 3})
+        time.sleep(0.15)
+        store.create({'n': 4})
+        self.assertEqual(len(store._sessions), 2)
+        self.assertNotIn(stale[0], store)
+        self.assertIn(fresh, store)
+
+    def test_evicts_least_recently_used_past_max_sessions(self):
+        store = InMemorySessionStore(max_sessions=2)
+        first = store.create({'n': 1})
+        second = store.create({'n': 2})
+        store.get(first)
+        third = store.create({'n': 3})
+        self.assertIsNone(store.get(second))
+        self.assertIsNotNone(store.get(first))
+        self.assertIsNotNone(store.get(third))
+
+    def test_evicts_least_recently_used_past_max_bytes(self):
+        store = InMemorySessionStore(max_bytes=250)
+        first = store.create({'text': 'a' * 100})
+        second = store.create({'text': 'b' * 100})
+        store.get(first)
+        store.create({'text': 'c' * 100})
+        self.assertIsNone(store.get(second))
+        self.assertIsNotNone(store.get(first))
+
+    def test_keeps_a_single_oversized_session(self):
+        store = InMemorySessionStore(max_bytes=10)
+        session_id = store.create({'text': 'a' * 100})
+        self.assertIsNotNone(store.get(session_id))
+
+
+class SQLiteSessionStoreTest(SessionStoreContract, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'sessions.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_store(self, **kwargs):
+        return SQLiteSessionStore(self.path, **kwargs)
+
+    def test_prune_evicts_least_recently_used_past_max_bytes(self):
+        store = self.make_store(max_bytes=250)
+        first = store.create({'text': 'a' * 100})
+        time.sleep(0.01)
+        second = store.create({'text': 'b' * 100})
+        time.sleep(0.01)
+        store.get(first)
+        time.sleep(0.01)
+        third = store.create({'text': 'c' * 100})
+        store.prune()
+        self.assertIsNone(store.get(second))
+        self.assertIsNotNone(store.get(first))
+        self.assertIsNotNone(store.get(third))
+
+    def test_prune_drops_expired_sessions(self):
+        store = self.make_store(ttl=0.1)
+        session_id = store.create({'a': 1})
+        time.sleep(0.2)
+        store.prune()
+        count = store._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        self.assertEqual(count, 0)
+        self.assertIsNone(store.get(session_id))
+
+    def test_updates_are_atomic_across_store_instances(self):
+        # Separate instances have separate connections, like separate worker processes
+        stores = [self.make_store() for _ in range(4)]
+        session_id = stores[0].create({'count': 0})
+
+        def increment(store):
+            for _ in range(25):
+                store.update(session_id, lambda data: data.update(count=data['count'] + 1))
+
+        threads = [threading.Thread(target=increment, args=(store,)) for store in stores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.make_store().get(session_id)['count'], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()